@@ -0,0 +1,92 @@
+import io
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+try:
+    from lxml import etree
+except ImportError:  # optional: only used when the regex finds nothing
+    etree = None
+
+# The first <script type="application/json"> of the email, taken straight from the HTML
+JSON_SCRIPT_RE = re.compile(
+    r'<script\b[^>]*?\stype\s*=\s*["\']?application/json["\']?(?:\s[^>]*)?>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+CORPUS_DIR = Path("cache") / "alert_emails"
+
+
+def _lxml_payload(html_content):
+    if etree is None:
+        return None
+    events = etree.iterparse(
+        io.BytesIO(html_content.encode('utf-8')), events=('end',), tag='script', html=True, recover=True
+    )
+    for _, element in events:
+        if element.get('type') == 'application/json':
+            return element.text
+        element.clear()
+    return None
+
+
+def find_json_payload(html_content):
+    """Text of the JSON script tag, without building a document tree"""
+    match = JSON_SCRIPT_RE.search(html_content)
+    if match:
+        return match.group(1)
+    return _lxml_payload(html_content)
+
+
+def iter_link_widgets(html_content):
+    """Yield the LINK widgets of the alert cards, one by one"""
+    payload = find_json_payload(html_content)
+    if not payload:
+        print("⚠️ No JSON script found in email.")
+        return
+
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        print("⚠️ Failed to parse JSON.")
+        return
+
+    for card in data.get('cards', []):
+        for widget in card.get('widgets', []):
+            if widget.get('type') == 'LINK':
+                yield widget
+
+
+def _soup_link_widgets(html_content):
+    # Previous implementation (full BeautifulSoup tree), kept for the benchmark
+    from bs4 import BeautifulSoup
+
+    script_tag = BeautifulSoup(html_content, 'html.parser').find('script', {'type': 'application/json'})
+    if not script_tag:
+        return []
+    data = json.loads(script_tag.string)
+    return [
+        widget
+        for card in data.get('cards', [])
+        for widget in card.get('widgets', [])
+        if widget.get('type') == 'LINK'
+    ]
+
+
+if __name__ == "__main__":
+    # Benchmark over saved alert emails (ALERTS_CORPUS_DIR in scrape_google_alert.py)
+    corpus_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else CORPUS_DIR
+    emails = [path.read_text(encoding='utf-8') for path in sorted(corpus_dir.glob("*.html"))]
+    if not emails:
+        sys.exit(f"No saved alert emails in {corpus_dir}")
+
+    for html_content in emails:
+        assert list(iter_link_widgets(html_content)) == _soup_link_widgets(html_content)
+
+    for name, extract in (("BeautifulSoup", _soup_link_widgets), ("regex", iter_link_widgets)):
+        start = time.perf_counter()
+        widgets = sum(len(list(extract(html_content))) for html_content in emails)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>13} : {elapsed / len(emails) * 1e3:.2f} ms / email ({widgets} widgets, {len(emails)} emails)")
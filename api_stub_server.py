@@ -0,0 +1,59 @@
+import http.server
+import sys
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# --- Settings ---
+RECORDINGS_DIR = Path("cache") / "api_recordings"
+PORT = 8765
+
+# Paging parameter of each API (Springer Nature Meta API, IEEE Xplore API)
+START_PARAMS = ("s", "start_record")
+
+
+def recording_for(recordings_dir, path):
+    """Recorded response of a request: '<last path segment>-<start>.json', else '<segment>.json'"""
+    parts = urlsplit(path)
+    name = parts.path.rstrip('/').rsplit('/', 1)[-1] or "index"
+    query = parse_qs(parts.query)
+    start = next((query[param][0] for param in START_PARAMS if param in query), None)
+    candidates = [f"{name}-{start}.json"] if start else []
+    candidates.append(f"{name}.json")
+    for candidate in candidates:
+        if (recordings_dir / candidate).exists():
+            return recordings_dir / candidate
+    return None
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Replays the recorded JSON responses; 404 for requests never recorded.
+
+    A '<recording>.status' file next to a recording replays that HTTP status
+    instead of 200 (expired key, rate limit).
+    """
+
+    recordings_dir = RECORDINGS_DIR
+
+    def do_GET(self):
+        recording = recording_for(self.recordings_dir, self.path)
+        if recording is None:
+            self.send_error(404, "No recording for this request")
+            return
+        body = recording.read_bytes()
+        status_file = recording.with_suffix(".status")
+        self.send_response(int(status_file.read_text()) if status_file.exists() else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == "__main__":
+    # python api_stub_server.py [recordings_dir] [port], then for example:
+    #   SPRINGER_API_URL=http://127.0.0.1:8765/json SPRINGER_API_KEY=stub python scrape_springer.py
+    #   IEEE_API_URL=http://127.0.0.1:8765/articles IEEE_API_KEY=stub python scrape_ieee.py
+    StubHandler.recordings_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else RECORDINGS_DIR
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else PORT
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    print(f"🧪 Replaying {StubHandler.recordings_dir} on http://127.0.0.1:{port}")
+    server.serve_forever()
@@ -0,0 +1,142 @@
+import hashlib
+import re
+import unicodedata
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qs, parse_qsl, urlencode, unquote
+
+from pymongo import UpdateOne
+
+IDENTITY_FIELD = "article_id"
+INDEX_COLLECTION = "article_index"
+
+TRACKING_PARAMS = re.compile(r'^(utm_[^=]*|fbclid|gclid)$', re.IGNORECASE)
+DOI_RE = re.compile(r'\b(10\.\d{4,9}/[^\s?#&"<>]+)', re.IGNORECASE)
+
+
+# --- Normalization ---
+def normalize_title(title):
+    title = unicodedata.normalize('NFKC', str(title or '')).casefold()
+    return ' '.join(re.sub(r'[^\w]+', ' ', title).split())
+
+
+def normalize_url(url):
+    """Lower-cased scheme/host, no fragment, tracking parameters or trailing slash"""
+    url = str(url or '').strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url.lower()
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not TRACKING_PARAMS.match(k)])
+    path = parts.path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def canonical_url(url):
+    """Normalized URL, with google.com/url?url=... redirects unwrapped"""
+    url = str(url or '')
+    if 'google.com/url' in url:
+        target = parse_qs(urlsplit(url).query).get('url', [None])[0]
+        if target:
+            url = target
+    return normalize_url(url)
+
+
+def normalize_doi(doi):
+    """'https://doi.org/10.1000/ABC.' -> '10.1000/abc'"""
+    match = DOI_RE.search(unquote(str(doi or '')))
+    if not match:
+        return None
+    return match.group(1).rstrip('.,;)').lower()
+
+
+# --- Identity ---
+def article_title(article):
+    return article.get("title") or article.get("titre")
+
+
+def article_url(article):
+    return article.get("url") or article.get("lien")
+
+
+def article_doi(article):
+    """DOI given by the source, or found in the article URL (Springer, Wiley, doi.org...)"""
+    return normalize_doi(article.get("doi")) or normalize_doi(canonical_url(article_url(article)))
+
+
+def article_identity(article):
+    """Cross-source identity: 'doi:<doi>' when known, else a hash of title + canonical URL"""
+    doi = article_doi(article)
+    if doi:
+        return f"doi:{doi}"
+    raw = normalize_title(article_title(article)) + "\n" + canonical_url(article_url(article))
+    return "sha1:" + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def assign_identities(articles):
+    for article in articles:
+        article[IDENTITY_FIELD] = article_identity(article)
+    return articles
+
+
+def backfill_identities(collection):
+    """Give an identity to documents stored before identities existed"""
+    missing = list(collection.find(
+        {IDENTITY_FIELD: {"$exists": False}}, {"title": 1, "titre": 1, "url": 1, "lien": 1, "doi": 1}
+    ))
+    if not missing:
+        return 0
+    assign_identities(missing)
+    collection.bulk_write([
+        UpdateOne({"_id": doc["_id"]}, {"$set": {IDENTITY_FIELD: doc[IDENTITY_FIELD]}}) for doc in missing
+    ], ordered=False)
+    register_articles(collection.database, collection.name, missing)
+    return len(missing)
+
+
+# --- Global dedup index ---
+def register_articles(db, collection_name, articles):
+    """Record in the index which collections hold each article identity"""
+    if not articles:
+        return
+    now = datetime.now()
+    ops = {}
+    for article in articles:
+        identity = article.get(IDENTITY_FIELD) or article_identity(article)
+        ops.setdefault(identity, UpdateOne(
+            {"_id": identity},
+            {
+                "$setOnInsert": {
+                    "title": article_title(article),
+                    "url": article_url(article),
+                    "doi": article_doi(article),
+                    "first_seen": now
+                },
+                "$addToSet": {"sources": collection_name}
+            },
+            upsert=True
+        ))
+    db[INDEX_COLLECTION].bulk_write(list(ops.values()), ordered=False)
+
+
+def unregister_articles(db, collection_name, identities):
+    """Forget that `collection_name` holds these identities (after a delete).
+
+    Identities still carried by another document of the collection stay.
+    """
+    identities = {i for i in identities if i}
+    if identities:
+        identities -= set(db[collection_name].distinct(IDENTITY_FIELD, {IDENTITY_FIELD: {"$in": list(identities)}}))
+    if not identities:
+        return
+    identities = list(identities)
+    index = db[INDEX_COLLECTION]
+    index.update_many({"_id": {"$in": identities}}, {"$pull": {"sources": collection_name}})
+    index.delete_many({"_id": {"$in": identities}, "sources": {"$size": 0}})
+
+
+def count_unique_articles(db, names):
+    """Distinct articles across `names` (documents without identity count once each)"""
+    indexed = db[INDEX_COLLECTION].count_documents({"sources": {"$in": list(names)}})
+    unindexed = sum(db[name].count_documents({IDENTITY_FIELD: {"$exists": False}}) for name in names)
+    return indexed + unindexed
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from http_cache import CacheMiss, request_key
+
+# --- Settings ---
+DEFAULT_RATE = 0.5        # requests per second and per host
+DEFAULT_BURST = 2
+LIMIT_PER_HOST = 4        # pooled keep-alive connections per host
+TIMEOUT = 30
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `capacity` stored"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    def _loop_lock(self):
+        # A bucket shared between fetch_all calls outlives their event loops
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        return self._lock
+
+    async def acquire(self):
+        async with self._loop_lock():
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FetchResult:
+    def __init__(self, url, status, headers, body, from_cache=False):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class AsyncFetcher:
+    """Pooled keep-alive HTTP client with per-host politeness.
+
+    Use as `async with AsyncFetcher(...) as fetcher:`; every request first
+    takes a token from its host's bucket instead of sleeping a fixed time.
+    `host_rates` overrides (rate, burst) for specific hosts. With a
+    `cache` (http_cache.ResponseCache), fresh responses cost no request
+    and stale ones are revalidated. Passing the same `buckets` dict to
+    successive fetchers keeps one politeness budget per host across them
+    (one fetcher at a time).
+    """
+
+    def __init__(self, headers=None, rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_rates=None,
+                 limit_per_host=LIMIT_PER_HOST, timeout=TIMEOUT, cache=None, buckets=None):
+        self.headers = headers or {}
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.cache = cache
+        self._buckets = {} if buckets is None else buckets
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector, headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self._buckets:
+            rate, burst = self.host_rates.get(host, (self.rate, self.burst))
+            self._buckets[host] = TokenBucket(rate, burst)
+        return self._buckets[host]
+
+    async def get(self, url, params=None, headers=None):
+        if self.cache is None:
+            return await self._get(url, params, headers)
+
+        key = request_key(url, params)
+        entry = self.cache.get(key)
+        if entry and (self.cache.offline or self.cache.is_fresh(entry)):
+            return FetchResult(entry.url, entry.status, entry.headers, entry.body, from_cache=True)
+        if self.cache.offline:
+            raise CacheMiss(key)
+
+        if entry:
+            headers = {**(headers or {}), **entry.validators()}
+        result = await self._get(url, params, headers)
+        if result.status == 304 and entry:
+            headers = self.cache.touch(key, result.headers) or entry.headers
+            return FetchResult(entry.url, entry.status, headers, entry.body, from_cache=True)
+        if result.status == 200:
+            self.cache.put(key, result.status, result.headers, result.body)
+        return result
+
+    async def _get(self, url, params=None, headers=None):
+        await self._bucket(url).acquire()
+        async with self.session.get(url, params=params, headers=headers) as response:
+            body = await response.read()
+            return FetchResult(str(response.url), response.status, dict(response.headers), body)
+
+    async def get_many(self, requests):
+        """Fetch [(url, params), ...] concurrently; failed requests yield the exception"""
+        return await asyncio.gather(
+            *(self.get(url, params=params) for url, params in requests), return_exceptions=True
+        )
+
+
+def fetch_all(requests, **fetcher_kwargs):
+    """Synchronous helper for the scraper scripts"""
+    async def _run():
+        async with AsyncFetcher(**fetcher_kwargs) as fetcher:
+            return await fetcher.get_many(requests)
+    return asyncio.run(_run())
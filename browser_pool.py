@@ -0,0 +1,153 @@
+import os
+import queue
+import random
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# --- Settings ---
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+MAX_PAGES_PER_SESSION = int(os.getenv("BROWSER_MAX_PAGES", "20"))
+BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "1") == "1"
+
+# Not needed to read result lists: images, fonts and stylesheets are never downloaded
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+]
+
+DEFAULT_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.6167.160 Safari/537.36",
+]
+
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    """Locate (or download) chromedriver once per process.
+
+    CHROMEDRIVER_PATH skips webdriver-manager entirely.
+    """
+    return os.getenv("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+
+
+def build_options(user_agents=DEFAULT_USER_AGENTS, headless=True, block_resources=BLOCK_RESOURCES):
+    options = Options()
+    options.add_argument(f"user-agent={random.choice(user_agents)}")
+    if block_resources:
+        # driver.get returns at DOMContentLoaded; scrapers wait for their results explicitly
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    else:
+        options.add_argument("--start-maximized")
+    return options
+
+
+class _Session:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """Pool of warm Chrome sessions shared by the Selenium scrapers.
+
+    Sessions are created lazily up to `size`, handed out with `session()`
+    and recycled (quit and replaced) after `max_pages` pages or on a
+    WebDriver error. With `block_resources`, images, fonts and stylesheets
+    are blocked through the DevTools protocol.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES_PER_SESSION,
+                 user_agents=DEFAULT_USER_AGENTS, headless=True, block_resources=BLOCK_RESOURCES):
+        self.size = size
+        self.max_pages = max_pages
+        self.user_agents = user_agents
+        self.headless = headless
+        self.block_resources = block_resources
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        options = build_options(self.user_agents, self.headless, self.block_resources)
+        driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+        if self.block_resources:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        return _Session(driver)
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            # No idle session: open a new one if the pool is not full
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self._new_session()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # Otherwise wait for a session to be released (or recycled)
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _discard(self, session):
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def session(self):
+        """Borrow a driver for one page"""
+        session = self._acquire()
+        healthy = True
+        try:
+            yield session.driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            session.pages += 1
+            if not healthy or session.pages >= self.max_pages:
+                self._discard(session)
+            else:
+                self._idle.put(session)
+
+    def close(self):
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
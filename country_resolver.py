@@ -0,0 +1,96 @@
+import gettext
+import json
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+import pycountry
+
+# --- Settings ---
+TABLE_PATH = Path("cache/country_iso3.json")
+FUZZY_CACHE_SIZE = 512
+
+
+def _normalize(name):
+    """Case-, accent- and whitespace-insensitive key for a country name"""
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(name.casefold().split())
+
+
+def _build_exact_index():
+    """name / official name / common name / alpha-2 / alpha-3 -> alpha-3.
+
+    French names are added as well since Talkwalker alerts are in French.
+    """
+    try:
+        french = gettext.translation('iso3166-1', pycountry.LOCALES_DIR, languages=['fr']).gettext
+    except OSError:
+        french = None
+
+    index = {}
+    for country in pycountry.countries:
+        names = [country.alpha_2, country.alpha_3, country.name]
+        names += [getattr(country, attr, None) for attr in ('official_name', 'common_name')]
+        if french:
+            names.append(french(country.name))
+        for name in filter(None, names):
+            index.setdefault(_normalize(name), country.alpha_3)
+    return index
+
+
+@lru_cache(maxsize=FUZZY_CACHE_SIZE)
+def _search_fuzzy(key):
+    try:
+        return pycountry.countries.search_fuzzy(key)[0].alpha_3
+    except LookupError:
+        return None
+
+
+class CountryResolver:
+    """Country name -> ISO3 with a persistent lookup table.
+
+    Lookups go through the stored table, then exact pycountry matches, then a
+    bounded LRU around search_fuzzy. Misses are stored too (as null) so an
+    unknown name is only searched once.
+    """
+
+    def __init__(self, table_path=TABLE_PATH):
+        self.table_path = Path(table_path)
+        self.table = self._load_table()
+        self._exact = None
+        self._dirty = False
+
+    def _load_table(self):
+        if not self.table_path.exists():
+            return {}
+        try:
+            with open(self.table_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def resolve(self, country_name):
+        if not country_name or not str(country_name).strip():
+            return None
+        key = _normalize(country_name)
+        if key in self.table:
+            return self.table[key]
+
+        if self._exact is None:
+            self._exact = _build_exact_index()
+        iso3 = self._exact.get(key) or _search_fuzzy(key)
+
+        self.table[key] = iso3
+        self._dirty = True
+        return iso3
+
+    def save(self):
+        """Persist new entries of the lookup table (no-op if nothing changed)"""
+        if not self._dirty:
+            return
+        self.table_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.table_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.table, f, ensure_ascii=False, indent=0, sort_keys=True)
+        tmp_path.replace(self.table_path)
+        self._dirty = False
@@ -0,0 +1,267 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import whois
+from pymongo import MongoClient, ReplaceOne
+
+from article_identity import register_articles, unregister_articles
+from credibility_rules import load_rules
+
+# --- Settings ---
+CACHE_PATH = Path("cache/whois_cache.sqlite")
+CACHE_TTL = 30 * 24 * 3600        # domain age barely changes
+ERROR_TTL = 24 * 3600             # retry failed lookups the next day
+MIN_DOMAIN_AGE_DAYS = 180         # less than 6 months = suspicious
+MIN_SCORE = 0.5                   # domains weighted below this are rejected
+MAX_WORKERS = 8
+WHOIS_SERVER_INTERVAL = 1.0       # seconds between two queries to the same WHOIS server
+
+class Verdict:
+    """Credibility verdict for one domain"""
+
+    def __init__(self, domain, credible, reason=None, creation_date=None, score=None):
+        self.domain = domain
+        self.credible = credible
+        self.reason = reason
+        self.creation_date = creation_date
+        self.score = score if score is not None else float(credible)
+
+    def __repr__(self):
+        return f"Verdict({self.domain!r}, credible={self.credible}, reason={self.reason!r}, score={self.score})"
+
+
+def _naive_utc(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def whois_creation_date(domain):
+    """Creation date of a domain with python-whois (None if unknown)"""
+    creation_date = whois.whois(domain).creation_date
+    if isinstance(creation_date, list):
+        creation_date = creation_date[0]
+    return _naive_utc(creation_date) if isinstance(creation_date, datetime) else None
+
+
+class WhoisCache:
+    """SQLite cache of WHOIS creation dates with a TTL"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, error_ttl=ERROR_TTL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS whois (
+                domain TEXT PRIMARY KEY,
+                creation_date TEXT,
+                credible INTEGER,
+                reason TEXT,
+                checked_at REAL
+            )
+        """)
+
+    def get(self, domain, now=None):
+        """(found, creation_date, reason) for a fresh entry"""
+        now = now or time.time()
+        row = self.conn.execute(
+            "SELECT creation_date, reason, checked_at FROM whois WHERE domain = ?", (domain,)
+        ).fetchone()
+        if not row:
+            return False, None, None
+        creation_date, reason, checked_at = row
+        ttl = self.error_ttl if reason == "whois_error" else self.ttl
+        if now - checked_at > ttl:
+            return False, None, None
+        return True, datetime.fromisoformat(creation_date) if creation_date else None, reason
+
+    def put(self, verdict, now=None):
+        creation_date = verdict.creation_date.isoformat() if verdict.creation_date else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO whois VALUES (?, ?, ?, ?, ?)",
+            (verdict.domain, creation_date, int(verdict.credible), verdict.reason, now or time.time())
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class _ServerRateLimiter:
+    """Minimum interval between two calls sharing the same key"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._locks = defaultdict(threading.Lock)
+        self._next_call = {}
+        self._guard = threading.Lock()
+
+    def wait(self, key):
+        with self._guard:
+            lock = self._locks[key]
+        with lock:
+            delay = self._next_call.get(key, 0) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_call[key] = time.monotonic() + self.interval
+
+
+def _whois_server(domain):
+    # Registries run one WHOIS server per TLD
+    return domain.rsplit('.', 1)[-1]
+
+
+class CredibilityEngine:
+    """Checks the credibility of many domains at once.
+
+    Domains are deduplicated, the rules of credibility_rules.json are applied
+    first and only domains missing from (or expired in) the WHOIS cache are
+    looked up, on a bounded thread pool rate-limited per WHOIS server.
+    `lookup` can be replaced by a stub returning creation dates.
+    """
+
+    def __init__(self, cache=None, lookup=whois_creation_date, max_workers=MAX_WORKERS,
+                 server_interval=WHOIS_SERVER_INTERVAL, min_age_days=MIN_DOMAIN_AGE_DAYS, rules=None):
+        self.rules = rules if rules is not None else load_rules()
+        self.cache = cache if cache is not None else WhoisCache()
+        self.lookup = lookup
+        self.max_workers = max_workers
+        self.rate_limiter = _ServerRateLimiter(server_interval)
+        self.min_age_days = min_age_days
+
+    def static_verdict(self, domain):
+        """Allow-list / blacklist / TLD / weight verdict, or None when WHOIS is needed"""
+        weight = self.rules.weight(domain)
+        if self.rules.is_allowed(domain):
+            return Verdict(domain, True, "allowlist", score=weight)
+        if self.rules.is_blacklisted(domain):
+            return Verdict(domain, False, "blacklist")
+        if self.rules.has_suspicious_tld(domain):
+            return Verdict(domain, False, "suspicious_tld")
+        if weight < MIN_SCORE:
+            return Verdict(domain, False, "low_weight", score=weight)
+        return None
+
+    def age_verdict(self, domain, creation_date, reason=None):
+        if reason == "whois_error":
+            return Verdict(domain, False, reason)
+        if not creation_date:
+            return Verdict(domain, False, "no_creation_date")
+        if (datetime.now() - creation_date).days < self.min_age_days:
+            return Verdict(domain, False, "young_domain", creation_date)
+        return Verdict(domain, True, None, creation_date, score=self.rules.weight(domain))
+
+    def _lookup(self, domain):
+        self.rate_limiter.wait(_whois_server(domain))
+        return self.lookup(domain)
+
+    def check_domains(self, domains):
+        """{domain: Verdict} for every distinct non-empty domain"""
+        verdicts = {}
+        to_lookup = []
+        for domain in {d.lower() for d in domains if d}:
+            verdict = self.static_verdict(domain)
+            if verdict is None:
+                found, creation_date, reason = self.cache.get(domain)
+                if not found:
+                    to_lookup.append(domain)
+                    continue
+                verdict = self.age_verdict(domain, creation_date, reason)
+            verdicts[domain] = verdict
+
+        if to_lookup:
+            print(f"🌐 WHOIS : {len(to_lookup)} domaines à vérifier ({len(verdicts)} déjà connus)")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._lookup, domain): domain for domain in to_lookup}
+            for future in as_completed(futures):
+                domain = futures[future]
+                try:
+                    verdict = self.age_verdict(domain, future.result())
+                except Exception as e:
+                    print(f"❌ WHOIS Error for {domain}: {e}")
+                    verdict = Verdict(domain, False, "whois_error")
+                self.cache.put(verdict)
+                verdicts[domain] = verdict
+        self.cache.commit()
+        return verdicts
+
+
+# --- Quarantine of rejected articles ---
+QUARANTINE_COLLECTION = "credibility_quarantine"
+
+
+def quarantine_articles(db, coll_name, rejected):
+    """Move rejected articles into the quarantine collection in one batch.
+
+    `rejected` is a list of (article, verdict). Documents are upserted into
+    the quarantine first (keyed by their original _id) and then removed from
+    their collection with a single delete_many, so nothing is lost if the
+    run stops in between.
+    """
+    if not rejected:
+        return 0
+    now = datetime.now()
+    ops = [
+        ReplaceOne({"_id": article["_id"]}, {
+            "_id": article["_id"],
+            "collection": coll_name,
+            "domain": verdict.domain,
+            "reason": verdict.reason,
+            "score": verdict.score,
+            "quarantined_at": now,
+            "document": article
+        }, upsert=True)
+        for article, verdict in rejected
+    ]
+    db[QUARANTINE_COLLECTION].bulk_write(ops, ordered=False)
+    result = db[coll_name].delete_many({"_id": {"$in": [article["_id"] for article, _ in rejected]}})
+    unregister_articles(db, coll_name, [article.get("article_id") for article, _ in rejected])
+    return result.deleted_count
+
+
+def restore_quarantined(db, query=None):
+    """Put quarantined documents matching `query` back into their collection"""
+    quarantine = db[QUARANTINE_COLLECTION]
+    by_collection = defaultdict(list)
+    for entry in quarantine.find(query or {}):
+        by_collection[entry["collection"]].append(entry["document"])
+
+    restored = 0
+    for coll_name, documents in by_collection.items():
+        ops = [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in documents]
+        db[coll_name].bulk_write(ops, ordered=False)
+        register_articles(db, coll_name, documents)
+        quarantine.delete_many({"_id": {"$in": [doc["_id"] for doc in documents]}})
+        restored += len(documents)
+    return restored
+
+
+def rescore_quarantine(db, engine):
+    """Re-apply the current rules to quarantined domains and restore the credible ones"""
+    domains = db[QUARANTINE_COLLECTION].distinct("domain")
+    verdicts = engine.check_domains(domains)
+    credible = [domain for domain, verdict in verdicts.items() if verdict.credible]
+    if not credible:
+        return 0
+    return restore_quarantined(db, {"domain": {"$in": credible}})
+
+
+if __name__ == "__main__":
+    # Nightly job, after credibility_test.py: the current rules and the WHOIS
+    # entries expired since the quarantine may clear some domains
+    client = MongoClient("mongodb://localhost:27017/")
+    engine = CredibilityEngine()
+    restored = rescore_quarantine(client["veille_agriculture"], engine)
+    print(f"♻️ {restored} articles sortis de la quarantaine")
+    engine.cache.close()
+    client.close()
@@ -0,0 +1,79 @@
+import json
+import time
+from pathlib import Path
+
+# --- Settings ---
+RULES_PATH = Path(__file__).with_name("credibility_rules.json")
+DEFAULT_WEIGHT = 1.0
+
+
+def _clean_domain(domain):
+    return domain.strip().lower().lstrip('.').removeprefix('www.')
+
+
+def domain_suffixes(domain):
+    """'a.b.example.com' -> 'a.b.example.com', 'b.example.com', 'example.com', 'com'"""
+    labels = domain.split('.')
+    return ['.'.join(labels[i:]) for i in range(len(labels))]
+
+
+class RuleSet:
+    """Hash-set index of the credibility rules.
+
+    A domain matches a rule when the rule is one of its label suffixes
+    ('news.infowars.com' matches 'infowars.com', 'notinfowars.com' does not),
+    so a lookup costs one set probe per label whatever the number of rules.
+    """
+
+    def __init__(self, blacklist=(), allowlist=(), suspicious_tlds=(), weights=None):
+        self.blacklist = {_clean_domain(d) for d in blacklist}
+        self.allowlist = {_clean_domain(d) for d in allowlist}
+        self.suspicious_tlds = {tld.strip().lower().lstrip('.') for tld in suspicious_tlds}
+        self.weights = {_clean_domain(d): float(w) for d, w in (weights or {}).items()}
+
+    @classmethod
+    def from_file(cls, path=RULES_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+        return cls(
+            blacklist=rules.get("blacklist", []),
+            allowlist=rules.get("allowlist", []),
+            suspicious_tlds=rules.get("suspicious_tlds", []),
+            weights=rules.get("weights", {})
+        )
+
+    def _first_match(self, domain, rules):
+        for suffix in domain_suffixes(_clean_domain(domain)):
+            if suffix in rules:
+                return suffix
+        return None
+
+    def is_allowed(self, domain):
+        return self._first_match(domain, self.allowlist) is not None
+
+    def is_blacklisted(self, domain):
+        return self._first_match(domain, self.blacklist) is not None
+
+    def has_suspicious_tld(self, domain):
+        return domain.rsplit('.', 1)[-1].lower() in self.suspicious_tlds
+
+    def weight(self, domain):
+        """Weight of the most specific matching rule (DEFAULT_WEIGHT if none)"""
+        suffix = self._first_match(domain, self.weights)
+        return self.weights[suffix] if suffix else DEFAULT_WEIGHT
+
+
+def load_rules(path=RULES_PATH):
+    return RuleSet.from_file(path)
+
+
+# --- Microbenchmark: lookup cost as the blacklist grows ---
+if __name__ == "__main__":
+    probes = [f"www.site{i}.example{i % 7}.com" for i in range(20000)]
+    for size in (10, 1000, 100000):
+        rules = RuleSet(blacklist=[f"bad{i}.com" for i in range(size)], suspicious_tlds=[".xyz"])
+        start = time.perf_counter()
+        for domain in probes:
+            rules.is_blacklisted(domain)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>7} règles : {elapsed / len(probes) * 1e6:.2f} µs / domaine")
@@ -1,10 +1,7 @@
-import requests
-from urllib.parse import urlparse
-import whois
 from pymongo import MongoClient
 from datetime import datetime
-import time
-import random
+from credibility_engine import CredibilityEngine, Verdict, quarantine_articles
+from domain_utils import extract_domain
 
 # --- MongoDB connection ---
 client = MongoClient("mongodb://localhost:27017/")
@@ -18,77 +15,54 @@ collections = [
     "talkwalker_alerts_Agricuture_4.0"
 ]
 
-# --- Filtering criteria ---
-BLACKLISTED_DOMAINS = [
-    "infowars.com", "naturalnews.com", "worldnewsdailyreport.com", "beforeitsnews.com",
-    "theonion.com", "clickhole.com", "babylonbee.com", "dailybuzzlive.com", "empirenews.net"
-]
-
-SUSPICIOUS_TLDS = [
-    ".xyz", ".top", ".biz", ".click", ".gq", ".info", ".tk", ".cf", ".ml", ".ga"
-]
-
-# --- Function to check domain credibility ---
-def check_domain(url):
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        tld = "." + domain.split('.')[-1]
-
-        # Check blacklisted domains
-        if any(bad_domain in domain for bad_domain in BLACKLISTED_DOMAINS):
-            return False
-
-        # Check suspicious TLDs
-        if tld in SUSPICIOUS_TLDS:
-            return False
-
-        # Check domain age via WHOIS
-        whois_info = whois.whois(domain)
-        creation_date = whois_info.creation_date
-
-        if isinstance(creation_date, list):
-            creation_date = creation_date[0]
-
-        if not creation_date:
-            return False
-        
-        age_in_days = (datetime.now() - creation_date).days
-        if age_in_days < 180:  # Less than 6 months = suspicious
-            return False
-
-        return True
-
-    except Exception as e:
-        print(f"❌ WHOIS Error for {url}: {e}")
-        return False
+# --- Function to get the domain of an article ---
+def article_domain(article):
+    url = article.get("url", "")
+    if not url:
+        return None
+    domain = article.get("domain") or extract_domain(url, article.get("source", ""))
+    return domain.lower() if domain else None
+
+# --- Load today's articles of every collection ---
+# The same article can be stored by several collections: its domain is
+# checked once, and every copy gets the same verdict.
+today = datetime.now().strftime("%Y-%m-%d")
+articles_by_collection = {}
+for coll_name in collections:
+    articles_by_collection[coll_name] = list(db[coll_name].find({"date": today}))
+unique_articles = {
+    article.get("article_id") or article["_id"]: article
+    for articles in articles_by_collection.values()
+    for article in articles
+}
+print(f"📚 {len(unique_articles)} articles uniques aujourd'hui")
+
+# --- Check every distinct domain once (cached WHOIS, bounded worker pool) ---
+engine = CredibilityEngine()
+all_domains = {article_domain(article) for article in unique_articles.values()}
+all_domains.discard(None)
+verdicts = engine.check_domains(all_domains)
 
 # --- Main credibility check ---
-for coll_name in collections:
-    collection = db[coll_name]
+for coll_name, articles in articles_by_collection.items():
     print(f"\n🔎 Vérification de la collection: {coll_name}")
-
-    today = datetime.now().strftime("%Y-%m-%d")
-    articles = list(collection.find({"date": today}))
-
     print(f"Articles trouvés aujourd'hui : {len(articles)}")
 
-    removed_count = 0
-
+    # Collect the rejected articles, then quarantine them in one batch
+    rejected = []
     for article in articles:
-        url = article.get("url", "")
-
-        if url:
-            is_valid = check_domain(url)
-
-            if not is_valid:
-                collection.delete_one({"_id": article["_id"]})
-                removed_count += 1
+        if not article.get("url", ""):
+            continue
 
-            time.sleep(random.uniform(1, 2))  # simulate human behavior
+        domain = article_domain(article)
+        verdict = verdicts.get(domain) or Verdict(domain, False, "no_domain")
+        if not verdict.credible:
+            rejected.append((article, verdict))
 
-    print(f"🗑️ Articles supprimés (non crédibles) : {removed_count}")
+    removed_count = quarantine_articles(db, coll_name, rejected)
+    print(f"🗑️ Articles mis en quarantaine (non crédibles) : {removed_count}")
 
 print("\n✅ Vérification de crédibilité terminée pour toutes les collections.")
 
+engine.cache.close()
 client.close()
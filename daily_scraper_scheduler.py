@@ -1,20 +1,38 @@
+import os
+import sys
 import schedule
 import time
-import subprocess
+from pipeline_runner import Job, run_pipeline
+
+# Interpreter and parallelism can be overridden from the environment
+PYTHON = os.getenv("PIPELINE_PYTHON", sys.executable)
+MAX_PARALLEL = int(os.getenv("PIPELINE_MAX_PARALLEL", "3"))
+
+# The ingestion scrapers are independent; the credibility test runs after all of them
+INGESTION_JOBS = [
+    Job("ieee", "scrape_ieee.py", retries=1),
+    Job("wiley", "scrape_wiley.py", retries=1),
+    Job("springer", "scrape_springer.py", retries=1),
+    # No retry: every run of the Scholar scraper spends SerpAPI credits
+    Job("scholar", "scrape_google_scholar.py"),
+    Job("google_alerts", "scrape_google_alert.py", retries=1),
+    #run the ones of the talkwalker
+    # Job("talkwalker_save", "scrape_talkwalker/auto_save_to_talkwalkerfolder.py"),
+    # Job("talkwalker_extract", "scrape_talkwalker/extract_informations_from_talkwalker.py", deps=["talkwalker_save"]),
+]
+JOBS = INGESTION_JOBS + [
+    # run the cerdibility test
+    Job("credibility", "credibility_test.py", deps=[job.name for job in INGESTION_JOBS]),
+    # Re-check the quarantined domains with today's rules and WHOIS cache
+    Job("rescore_quarantine", "credibility_engine.py", deps=["credibility"]),
+]
 
 def run_all_scrapers():
     print("🚀 Starting daily scraping...")
-    #run the sripts of the iee ,weily,springer,scholar,alerts
-    subprocess.run(["E:/anaconda/python.exe", "scrape_ieee.py"])
-    subprocess.run(["E:/anaconda/python.exe", "scrape_wiley.py"])
-    subprocess.run(["E:/anaconda/python.exe", "scrape_springer.py"])
-    subprocess.run(["E:/anaconda/python.exe", "scrape_google_scholar.py"])
-    subprocess.run(["E:/anaconda/python.exe", "scrape_google_alert.py"])
-    #run the ones of the talkwalker 
-    # subprocess.run(["E:/anaconda/python.exe", "scrape_talkwalker\auto_save_to_talkwalkerfolder.py"])
-    # subprocess.run(["E:/anaconda/python.exe", "scrape_talkwalker\extract_informations_from_talkwalker.py"])
-    # run the cerdibility test 
-    subprocess.run(["E:/anaconda/python.exe", "credibility_test.py"])
+    results = run_pipeline(JOBS, max_parallel=MAX_PARALLEL, python=PYTHON)
+    failed = [name for name, result in results.items() if result["status"] != "success"]
+    if failed:
+        print(f"⚠️ Jobs en échec : {', '.join(failed)}")
     print("✅ All scrapers finished!")
 
 # Schedule once today at 00:32
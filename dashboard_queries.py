@@ -0,0 +1,180 @@
+from collections import Counter
+
+import pandas as pd
+
+from article_identity import count_unique_articles
+from ingestion_writer import RANK_FIELD
+
+# --- Collections shown in the dashboard ---
+GOOGLE_ALERTS_COLLECTION = 'google_alerts_Agriculture4.0'
+TALKWALKER_COLLECTION = 'talkwalker_alerts_Agricuture_4.0'
+
+NEWEST_COLLECTIONS = [
+    GOOGLE_ALERTS_COLLECTION,
+    'ieee_agriculture_4_0_newest', 'scholar_agriculture_4_0_newest',
+    'springer_agriculture_4_0_newest', 'wiley_agriculture_4_0_newest'
+]
+RELEVANT_COLLECTIONS = [
+    'ieee_agriculture_4_0_relevant', 'scholar_agriculture_4_0_relevant',
+    'springer_agriculture_4_0_relevant', 'wiley_agriculture_4_0_relevant'
+]
+ALL_COLLECTIONS = NEWEST_COLLECTIONS + RELEVANT_COLLECTIONS + [TALKWALKER_COLLECTION]
+
+# Talkwalker documents use French field names
+URL_FIELD = {"$ifNull": ["$url", "$lien"]}
+TITLE_FIELD = {"$ifNull": ["$title", "$titre"]}
+
+
+def collection_source(name):
+    """Same label the dashboard historically derived from the collection name"""
+    return name.replace('_', ' ').replace('.', ' ').title()
+
+
+def get_collection_label(name):
+    if "Google Alerts" in name: return "Google Alerts"
+    if "Ieee" in name: return "IEEE Xplore"
+    if "Scholar" in name: return "Google Scholar"
+    if "Springer" in name: return "Springer"
+    if "Wiley" in name: return "Wiley Online Library"
+    return name
+
+
+# --- Aggregation expressions ---
+def _first_capture(regex_find):
+    return {"$let": {"vars": {"m": regex_find}, "in": {"$arrayElemAt": ["$$m.captures", 0]}}}
+
+
+def domain_expression(unwrap_redirects=False):
+    """Domain stored at ingest, or a server-side equivalent of extract_domain.
+
+    The regex fallback only matters for documents inserted before the domain
+    was stored (see domain_utils.backfill_domains). For Google Alerts,
+    google.com/url?url=... redirects are unwrapped to the target host.
+    """
+    netloc = _first_capture({"$regexFind": {
+        "input": URL_FIELD, "regex": r"^[a-z][a-z0-9+.-]*://([^/?#]+)", "options": "i"
+    }})
+    if not unwrap_redirects:
+        return {"$ifNull": ["$domain", netloc]}
+    target = _first_capture({"$regexFind": {
+        "input": URL_FIELD,
+        "regex": r"[?&]url=[a-z][a-z0-9+.-]*(?::|%3A)(?://|%2F%2F)([^/?#&%]+)",
+        "options": "i"
+    }})
+    is_redirect = {"$regexMatch": {"input": URL_FIELD, "regex": r"google\.com/url"}}
+    return {"$ifNull": ["$domain", {"$cond": [is_redirect, target, netloc]}]}
+
+
+def _aggregate_counts(db, names, group_key):
+    """Run a $group count per collection and merge the (small) results"""
+    counts = Counter()
+    for name in names:
+        pipeline = [
+            {"$project": {"key": group_key(name)}},
+            {"$group": {"_id": "$key", "count": {"$sum": 1}}}
+        ]
+        for row in db[name].aggregate(pipeline):
+            if row["_id"] is not None:
+                counts[row["_id"]] += row["count"]
+    return counts
+
+
+# --- Panels ---
+def count_publications(db, names=ALL_COLLECTIONS):
+    """Distinct articles, an article stored by several collections counting once"""
+    return count_unique_articles(db, names)
+
+
+def domain_counts(db, names=ALL_COLLECTIONS):
+    """Counter of publications per source domain"""
+    return _aggregate_counts(
+        db, names, lambda name: domain_expression(unwrap_redirects=name == GOOGLE_ALERTS_COLLECTION)
+    )
+
+
+def top_domains(counts, limit=10):
+    """Top rows of a domain_counts() result, shaped for st.dataframe"""
+    return pd.DataFrame(counts.most_common(limit), columns=['Domaine', "Nombre de publications collectées"])
+
+
+def country_counts(db, name=TALKWALKER_COLLECTION):
+    """Publications per Talkwalker country, most frequent first.
+
+    iso_alpha is the ISO3 code stored at import time (None for older documents).
+    """
+    pipeline = [
+        {"$match": {"pays": {"$ne": None}}},
+        {"$group": {"_id": "$pays", "count": {"$sum": 1}, "iso_alpha": {"$max": "$iso3"}}},
+        {"$sort": {"count": -1}}
+    ]
+    rows = list(db[name].aggregate(pipeline))
+    return pd.DataFrame(
+        [(r["_id"], r["count"], r.get("iso_alpha")) for r in rows],
+        columns=['country', 'count', 'iso_alpha']
+    )
+
+
+def daily_counts(db, names=ALL_COLLECTIONS):
+    """Number of publications inserted per day, oldest first"""
+    counts = _aggregate_counts(db, names, lambda name: "$date")
+    df = pd.DataFrame(sorted(counts.items()), columns=['insertion_day', 'count'])
+    df['insertion_day'] = pd.to_datetime(df['insertion_day'], errors="coerce").dt.date
+    return df.dropna(subset=['insertion_day']).groupby('insertion_day', as_index=False)['count'].sum()
+
+
+def last_insertion_date(db, names=ALL_COLLECTIONS):
+    """Most recent insertion date (as a Timestamp) across the given collections"""
+    dates = []
+    for name in names:
+        pipeline = [
+            {"$match": {"date": {"$type": "string"}}},
+            {"$group": {"_id": None, "last": {"$max": "$date"}}}
+        ]
+        dates += [row["last"] for row in db[name].aggregate(pipeline)]
+    last = pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce").max()
+    return last if pd.notna(last) else None
+
+
+def available_labels(db, names):
+    """Source labels of the non-empty collections, for the filter boxes"""
+    return sorted({
+        get_collection_label(collection_source(name))
+        for name in names if db[name].estimated_document_count()
+    })
+
+
+def fetch_items(db, names, day):
+    """Full rows (title, url, date, rank) of the given insertion day only.
+
+    Ranked collections (refreshed in place, see ingestion_writer.refresh_articles)
+    are returned whole, in rank order: their current ranking keeps its first
+    insertion dates.
+    """
+    if day is None:
+        return pd.DataFrame(columns=['title', 'url', 'insertion_date', 'source', 'source_label'])
+    day_str = pd.Timestamp(day).strftime("%Y-%m-%d")
+    frames = []
+    for name in names:
+        pipeline = [
+            {"$match": {"$or": [{"date": day_str}, {RANK_FIELD: {"$exists": True}}]}},
+            {"$project": {"_id": 0, "title": TITLE_FIELD, "url": URL_FIELD, "date": 1, "article_id": 1,
+                          RANK_FIELD: 1}}
+        ]
+        if name in RELEVANT_COLLECTIONS:
+            # Unranked documents (collections not refreshed by diff) keep their insertion order
+            pipeline.insert(1, {"$sort": {RANK_FIELD: 1, "_id": 1}})
+        rows = list(db[name].aggregate(pipeline))
+        if rows:
+            df = pd.DataFrame(rows)
+            df["source"] = collection_source(name)
+            df["source_label"] = get_collection_label(df["source"].iat[0])
+            frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['title', 'url', 'insertion_date', 'source', 'source_label'])
+    items = pd.concat(frames, ignore_index=True)
+    # Same article from several sources: keep the first one only
+    if "article_id" in items.columns:
+        items = items[items["article_id"].isna() | ~items["article_id"].duplicated()]
+    items["insertion_date"] = pd.to_datetime(items.pop("date"), errors="coerce")
+    # Collections in order, each in rank or server-side order: stable for paging
+    return items.reset_index(drop=True)
@@ -0,0 +1,71 @@
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+from pymongo import UpdateMany
+
+
+def extract_domain(url, source):
+    """Domain (netloc) of an article URL, unwrapping Google Alerts redirects"""
+    if pd.isna(url): return None
+    try:
+        if 'google.com/url' in url and 'Google Alerts' in source:
+            parsed = urlparse(url)
+            true_url = parse_qs(parsed.query).get('url', [None])[0]
+            return urlparse(true_url).netloc if true_url else None
+        return urlparse(url).netloc
+    except:
+        return None
+
+
+def extract_domains(urls, sources):
+    """Vectorized extract_domain over two aligned Series.
+
+    Each distinct (url, is Google Alerts) pair is parsed once and the results
+    are joined back, so repeated URLs across reruns and collections are cheap.
+    """
+    urls = pd.Series(urls, dtype=object)
+    is_alert = pd.Series(sources, dtype=object).astype(str).str.contains('Google Alerts', regex=False)
+    keys = pd.DataFrame({"url": urls.values, "alert": is_alert.values})
+
+    uniques = keys.dropna(subset=["url"]).drop_duplicates()
+    uniques["domain"] = [
+        extract_domain(url, 'Google Alerts' if alert else '')
+        for url, alert in zip(uniques["url"], uniques["alert"])
+    ]
+    domains = keys.merge(uniques, on=["url", "alert"], how="left")["domain"]
+    domains = domains.astype(object).where(domains.notna(), None)
+    return pd.Series(domains.values, index=urls.index, dtype=object)
+
+
+def backfill_domains(db, names, source_field="source"):
+    """Store the domain on documents ingested before it was computed at ingest"""
+    for name in names:
+        collection = db[name]
+        docs = list(collection.find(
+            {"domain": {"$exists": False}}, {"url": 1, "lien": 1, source_field: 1}
+        ))
+        if not docs:
+            continue
+        df = pd.DataFrame(docs)
+        url = df["url"] if "url" in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if "lien" in df.columns:
+            url = url.fillna(df["lien"])
+        source = df[source_field] if source_field in df.columns else pd.Series('', index=df.index)
+        df["domain"] = extract_domains(url, source.fillna(''))
+        # One UpdateMany per distinct domain rather than one update per document
+        ops = [
+            UpdateMany({"_id": {"$in": group["_id"].tolist()}},
+                       {"$set": {"domain": domain if pd.notna(domain) else None}})
+            for domain, group in df.groupby("domain", dropna=False)
+        ]
+        collection.bulk_write(ops, ordered=False)
+        print(f"✅ {len(df)} documents mis à jour dans '{name}'.")
+
+
+if __name__ == "__main__":
+    from pymongo import MongoClient
+    from dashboard_queries import ALL_COLLECTIONS
+
+    client = MongoClient("mongodb://localhost:27017/")
+    backfill_domains(client["veille_agriculture"], ALL_COLLECTIONS)
+    client.close()
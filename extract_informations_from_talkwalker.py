@@ -1,9 +1,21 @@
 import re
 import os
+import json
+import hashlib
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, DuplicateKeyError
+from pymongo.errors import BulkWriteError, ConnectionFailure
+from domain_utils import extract_domain
+from country_resolver import CountryResolver
+from article_identity import article_identity, register_articles
+from talkwalker_parser import iter_file_records, iter_records, split_lines
 
 # Configuration MongoDB
 MONGO_CONFIG = {
@@ -16,10 +28,106 @@ MONGO_CONFIG = {
 # Configuration des dossiers
 TALKWALKER_FOLDER = Path("scrape_talkwalker\talkwalker")  # Chemin relatif au script
 
+# Fichiers déjà importés (chemin -> taille, mtime, hash du contenu)
+MANIFEST_PATH = Path("cache") / "talkwalker_manifest.json"
+MAX_WORKERS = int(os.getenv("TALKWALKER_WORKERS", str(os.cpu_count() or 1)))
+BATCH_SIZE = int(os.getenv("TALKWALKER_BATCH_SIZE", "500"))
+DUPLICATE_KEY_ERROR = 11000
+
+# Nettoyage du titre : passes précompilées, dans l'ordre. Les règles ancrées
+# sur $ dépendent des sauts de ligne laissés par la passe précédente, d'où
+# 4 passes (au lieu de 7 re.sub) et pas une seule.
+TITLE_PASSES = [
+    re.compile(
+        r'^\[Talkwalker Alerts\].*?(?=Sujet :|$)'
+        r'|(?:Sujet :|De :|Date :|Pour :|Tell a Friend|Latest News from our blog).*$',
+        re.IGNORECASE
+    ),
+    re.compile(r'\s*Icon\s+', re.IGNORECASE),   # couvre aussi ^Icon\s+
+    re.compile(r'\.\.\..*$'),
+    re.compile(r'\s{2,}|[\n\t]'),
+]
+TRACKING_PARAMS_RE = re.compile(r'(\?|&)(utm_[^=]+=[^&]*|fbclid=[^&]*)+')
+DOMAIN_RE = re.compile(r'^(https?://)?(www\.)?([^/]+)')
+
+
+def clean_title(title):
+    for rule in TITLE_PASSES:
+        title = rule.sub(' ', title)
+    return title.strip()[:300]
+
+
+@lru_cache(maxsize=4096)
+def normalize_date(value):
+    """'dd/mm/yy HH:MM' -> 'YYYY-MM-DD' (les articles d'un export partagent souvent la même date)"""
+    try:
+        return datetime.strptime(value, '%d/%m/%y %H:%M').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def _parse_file(file_path):
+    """Worker : hash du contenu et articles extraits d'un fichier, lu en flux (mmap pour les gros exports)"""
+    hasher = hashlib.sha1()
+    articles = TalkwalkerImporter._extract_articles(iter_file_records(file_path, hasher))
+    return hasher.hexdigest(), articles
+
+
+class _BackgroundWriter:
+    """Thread d'écriture unique : un fichier est stocké pendant que les suivants sont préparés
+
+    Une erreur d'écriture ne concerne que son fichier (réimporté au prochain
+    lancement). Une erreur de `on_stored` arrête le thread : elle est relevée
+    par le submit() ou le close() suivant, et les fichiers encore en file
+    sont ignorés pour ne pas bloquer le producteur.
+    """
+
+    def __init__(self, store, on_stored, max_pending=4):
+        self._store = store
+        self._on_stored = on_stored
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, file_path, digest, articles):
+        if self._error is not None:
+            raise self._error
+        self._jobs.put((file_path, digest, articles))
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if self._error is not None:
+                continue
+            file_path, digest, articles = job
+            try:
+                inserted, duplicates = self._store(articles)
+            except Exception as e:
+                print(f"🚨 Erreur d'écriture pour {file_path.name}: {str(e)}")
+                continue
+            try:
+                self._on_stored(file_path, digest, articles, inserted, duplicates)
+            except Exception as e:
+                self._error = e
+
+    def close(self):
+        """Attend la fin des écritures en cours ; relève l'erreur du thread s'il y en a eu une"""
+        self._jobs.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
 class TalkwalkerImporter:
     def __init__(self, mongo_config):
         self.mongo_config = mongo_config
         self.db = self._connect_to_mongodb()
+        self.country_resolver = CountryResolver()
+        self.batch_size = BATCH_SIZE
+        self.totals = {'inserted': 0, 'duplicates': 0}
         
     def _connect_to_mongodb(self):
         """Connexion à MongoDB avec gestion des erreurs"""
@@ -42,71 +150,51 @@ class TalkwalkerImporter:
             print("- Le port 27017 est accessible")
             return None
 
-    def _clean_data(self, raw_data):
+    @staticmethod
+    def _clean_data(raw_data):
         """Nettoyage et validation des données"""
         # Nettoyage du titre
-        if 'title' in raw_data:
-            patterns = [
-                r'^\[Talkwalker Alerts\].*?(?=Sujet :|$)',
-                r'(Sujet :|De :|Date :|Pour :|Tell a Friend|Latest News from our blog).*$',
-                r'^Icon\s+',
-                r'\s*Icon\s+',
-                r'\.\.\..*$',
-                r'[\n\t]',
-                r'\s{2,}'
-            ]
-            for pattern in patterns:
-                raw_data['title'] = re.sub(pattern, ' ', raw_data['title'], flags=re.IGNORECASE)
-            raw_data['title'] = raw_data['title'].strip()[:300]
+        if 'titre' in raw_data:
+            raw_data['titre'] = clean_title(raw_data['titre'])
 
         # Normalisation de la date
         if 'date' in raw_data:
-            try:
-                raw_data['date'] = datetime.strptime(raw_data['date'], '%d/%m/%y %H:%M').strftime('%Y-%m-%d')
-            except ValueError:
-                raw_data['date'] = None
+            raw_data['date'] = normalize_date(raw_data['date'])
 
         # Nettoyage de l'URL
         if 'source' in raw_data:
-            url = re.sub(r'(\?|&)(utm_[^=]+=[^&]*|fbclid=[^&]*)+', '', raw_data['source'])
-            domain_match = re.search(r'^(https?://)?(www\.)?([^/]+)', url.strip().lower())
+            url = TRACKING_PARAMS_RE.sub('', raw_data['source'])
+            domain_match = DOMAIN_RE.search(url.strip().lower())
             raw_data['source'] = f"https://{domain_match.group(3)}" if domain_match else None
 
         return raw_data
 
-    def _extract_articles(self, file_content):
-        """Extraction des articles depuis le contenu du fichier"""
+    @staticmethod
+    def _extract_articles(records):
+        """Articles valides à partir des (titre, date, pays, lien) du parseur (sans accès à la base)"""
         articles = []
-        pattern = re.compile(
-            r'(?P<title>.+?)\n'
-            r'(?P<date>\d{2}/\d{2}/\d{2},? \d{2}:\d{2})'
-            r'(?:\s?[|,]\s?)'
-            r'(?P<country>.+?)'
-            r'(?:\s?[|,]\s?)'
-            r'(?P<source>.+?)(?:\n|$)',
-            re.DOTALL | re.MULTILINE
-        )
-
-        for match in pattern.finditer(file_content):
+        for title, date, country, source in records:
             try:
                 article = {
-                    'titre': match.group('title'),
-                    'date': match.group('date'),
-                    'pays': match.group('country').strip(),
-                    'lien': match.group('source'),
+                    'titre': title,
+                    'date': date,
+                    'pays': country.strip(),
+                    'lien': source,
                     'metadata': {
-                        'original_date': match.group('date'),
-                        'source_raw': match.group('source')
+                        'original_date': date,
+                        'source_raw': source
                     }
                 }
                 
-                article = self._clean_data(article)
+                article = TalkwalkerImporter._clean_data(article)
                 
                 # Validation finale
                 if all([article['titre'], article['date'], article['pays'], article['lien']]):
                     article.update({
                         'processed_at': datetime.utcnow(),
                         'source': 'Talkwalker',
+                        'domain': extract_domain(article['lien'], 'Talkwalker'),
+                        'article_id': article_identity(article),
                         'local_import': True
                     })
                     articles.append(article)
@@ -117,69 +205,103 @@ class TalkwalkerImporter:
 
         return articles
 
-    def _process_file(self, file_path):
-        """Traitement d'un fichier individuel"""
+    def _load_manifest(self):
+        if MANIFEST_PATH.exists():
+            return json.loads(MANIFEST_PATH.read_text(encoding='utf-8'))
+        return {}
+
+    def _save_manifest(self, manifest):
+        MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = MANIFEST_PATH.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent=1), encoding='utf-8')
+        tmp_path.replace(MANIFEST_PATH)
+
+    @staticmethod
+    def _is_unchanged(file_path, manifest):
+        """Même taille et même mtime que lors du dernier import"""
+        entry = manifest.get(str(file_path))
+        stat = file_path.stat()
+        return bool(entry) and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+
+    @staticmethod
+    def _record(file_path, manifest, digest, found):
+        stat = file_path.stat()
+        manifest[str(file_path)] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha1': digest,
+            'articles': found,
+            'imported_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+    def _import_parsed(self, file_path, future, manifest, writer):
+        """Préparation des articles d'un fichier analysé par un worker, puis envoi au writer"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-                if not content.strip():
-                    print(f"⚠ Fichier vide: {file_path.name}")
-                    return 0, 0
-
-                articles = self._extract_articles(content)
-                if not articles:
-                    print(f"ℹ️ Aucun article valide dans: {file_path.name}")
-                    return 0, 0
-
-                inserted = self._store_articles(articles)
-                print(f"✔ {file_path.name}: {len(articles)} articles extraits, {inserted} insérés")
-                return len(articles), inserted
-
-        except UnicodeDecodeError:
-            print(f"🚨 Problème d'encodage avec: {file_path.name}")
-            return 0, 0
+            digest, articles = future.result()
         except Exception as e:
             print(f"🚨 Erreur critique avec {file_path.name}: {str(e)}")
-            return 0, 0
+            return 0
 
-    def _store_articles(self, articles):
-        """Stockage des articles dans MongoDB"""
-        if not articles or not self.db:
+        entry = manifest.get(str(file_path))
+        if entry and entry['sha1'] == digest:
+            # Fichier touché mais contenu identique
+            self._record(file_path, manifest, digest, entry['articles'])
             return 0
 
+        if not articles:
+            print(f"ℹ️ Aucun article valide dans: {file_path.name}")
+            self._record(file_path, manifest, digest, 0)
+            return 0
+
+        for article in articles:
+            article['iso3'] = self.country_resolver.resolve(article['pays'])
+        writer.submit(file_path, digest, articles)
+        return len(articles)
+
+    def _ensure_indexes(self):
+        """Création des index (si inexistants), une fois par exécution"""
         collection = self.db[self.mongo_config["collection_name"]]
-        
-        # Création des index (si inexistants)
         collection.create_index([('lien', 1)], unique=True)
         collection.create_index([('date', 1)])
         collection.create_index([('pays', 1)])
+        collection.create_index([('article_id', 1)])
 
-        inserted_count = 0
-        batch_size = 50
-        batch = []
+    def _store_articles(self, articles):
+        """Stockage des articles dans MongoDB : (insérés, doublons)"""
+        if not articles or self.db is None:
+            return 0, 0
 
-        for article in articles:
-            try:
-                batch.append(article)
-                if len(batch) >= batch_size:
-                    result = collection.insert_many(batch, ordered=False)
-                    inserted_count += len(result.inserted_ids)
-                    batch = []
-            except Exception as e:
-                continue
+        collection = self.db[self.mongo_config["collection_name"]]
 
-        if batch:
+        inserted_count = 0
+        duplicate_count = 0
+        for i in range(0, len(articles), self.batch_size):
+            batch = articles[i:i + self.batch_size]
             try:
                 result = collection.insert_many(batch, ordered=False)
                 inserted_count += len(result.inserted_ids)
-            except Exception as e:
-                print(f"⚠ Erreur sur dernier lot: {str(e)}")
+            except BulkWriteError as e:
+                # Lot non ordonné : les documents valides sont insérés malgré les erreurs
+                inserted_count += e.details.get('nInserted', 0)
+                errors = e.details.get('writeErrors', [])
+                duplicates = sum(1 for error in errors if error.get('code') == DUPLICATE_KEY_ERROR)
+                duplicate_count += duplicates
+                if len(errors) > duplicates:
+                    print(f"⚠ {len(errors) - duplicates} erreurs d'écriture: {errors[0].get('errmsg')}")
+
+        register_articles(self.db, collection.name, articles)
+        return inserted_count, duplicate_count
 
-        return inserted_count
+    def _on_stored(self, file_path, manifest, digest, articles, inserted, duplicates):
+        # Appelé par le thread d'écriture, seul à modifier les totaux
+        self.totals['inserted'] += inserted
+        self.totals['duplicates'] += duplicates
+        print(f"✔ {file_path.name}: {len(articles)} articles extraits, {inserted} insérés, {duplicates} doublons")
+        self._record(file_path, manifest, digest, len(articles))
 
     def _generate_stats(self):
         """Génération des statistiques"""
-        if not self.db:
+        if self.db is None:
             return
 
         collection = self.db[self.mongo_config["collection_name"]]
@@ -214,7 +336,7 @@ class TalkwalkerImporter:
 
     def run_import(self):
         """Exécution complète de l'import"""
-        if not self.db:
+        if self.db is None:
             return False
 
         try:
@@ -226,25 +348,48 @@ class TalkwalkerImporter:
             if not files:
                 raise ValueError(f"Aucun fichier .txt trouvé dans: {TALKWALKER_FOLDER.absolute()}")
 
+            manifest = self._load_manifest()
+            pending = [file for file in sorted(files) if not self._is_unchanged(file, manifest)]
+
             print(f"\n📂 Dossier analysé: {TALKWALKER_FOLDER.absolute()}")
-            print(f"📄 Fichiers à traiter: {len(files)}")
+            print(f"📄 Fichiers à traiter: {len(pending)} ({len(files) - len(pending)} déjà importés)")
 
-            # Traitement
+            # Traitement : analyse en parallèle, écriture par un seul thread
             total_articles = 0
-            total_inserted = 0
-            
-            for file in sorted(files):
-                found, inserted = self._process_file(file)
-                total_articles += found
-                total_inserted += inserted
+            self.totals = {'inserted': 0, 'duplicates': 0}
+
+            if pending:
+                self._ensure_indexes()
+                writer = _BackgroundWriter(
+                    self._store_articles,
+                    lambda file_path, digest, articles, inserted, duplicates: self._on_stored(
+                        file_path, manifest, digest, articles, inserted, duplicates
+                    )
+                )
+                try:
+                    with ProcessPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(pending)))) as executor:
+                        futures = {executor.submit(_parse_file, str(file)): file for file in pending}
+                        for future in as_completed(futures):
+                            total_articles += self._import_parsed(futures[future], future, manifest, writer)
+                finally:
+                    try:
+                        writer.close()
+                    finally:
+                        # Les fichiers déjà stockés restent enregistrés, même après une erreur
+                        self._save_manifest(manifest)
+            total_inserted = self.totals['inserted']
+
+            # Sauvegarde de la table pays -> ISO3 enrichie pendant l'import
+            self.country_resolver.save()
 
             # Résultats
             print("\n" + "="*50)
             print("RAPPORT FINAL".center(50))
             print("="*50)
-            print(f"• Fichiers traités: {len(files)}")
+            print(f"• Fichiers traités: {len(pending)} / {len(files)}")
             print(f"• Articles valides: {total_articles}")
             print(f"• Nouveaux articles insérés: {total_inserted}")
+            print(f"• Doublons ignorés (lien déjà en base): {self.totals['duplicates']}")
             
             if total_inserted > 0:
                 print(f"\n💾 Taux de nouveauté: {(total_inserted/total_articles)*100:.1f}%")
@@ -256,7 +401,37 @@ class TalkwalkerImporter:
             print(f"\n🚨 ERREUR PRINCIPALE: {str(e)}")
             return False
 
+def benchmark(n_articles=100000):
+    """Coût par article du nettoyage et de l'extraction sur un export synthétique"""
+    countries = ["France", "Germany", "Brazil", "United States", "Kenya"]
+    export = "".join(
+        f"Icon [{i}] Agriculture 4.0 : capteurs et drones... Tell a Friend\n"
+        f"{1 + i % 28:02d}/{1 + i % 12:02d}/24 {i % 24:02d}:00 | {countries[i % 5]} | "
+        f"https://www.site{i % 500}.com/article-{i}?utm_source=talkwalker\n"
+        for i in range(n_articles)
+    )
+
+    # Articles tels que _extract_articles les passe à _clean_data (titre / date / lien)
+    raw_articles = [
+        {'titre': match.group('titre'), 'date': match.group('date'), 'lien': match.group('lien')}
+        for match in re.finditer(r'(?P<titre>.+)\n(?P<date>\S+ \S+) \| .+? \| (?P<lien>.+)\n', export)
+    ]
+    start = time.perf_counter()
+    for article in raw_articles:
+        TalkwalkerImporter._clean_data(article)
+    elapsed = time.perf_counter() - start
+    print(f"_clean_data      : {elapsed / len(raw_articles) * 1e6:.2f} µs / article")
+
+    start = time.perf_counter()
+    articles = TalkwalkerImporter._extract_articles(iter_records(split_lines(export)))
+    elapsed = time.perf_counter() - start
+    print(f"_extract_articles: {elapsed / n_articles * 1e6:.2f} µs / article ({len(articles)} articles valides)")
+
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+        sys.exit()
+
     print("=== Import Talkwalker vers MongoDB Compass ===")
     print(f"=== {datetime.now().strftime('%Y-%m-%d %H:%M')} ===\n")
     
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from article_identity import normalize_url
+
+# --- Settings ---
+CACHE_PATH = Path("cache") / "http_cache.sqlite"
+CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", str(12 * 3600)))          # seconds
+MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024
+OFFLINE = os.getenv("HTTP_CACHE_OFFLINE", "0") == "1"                  # replay only, no network
+
+# Parameters that never change the response (and must not end up on disk)
+IGNORED_PARAMS = {"api_key"}
+# Headers of a 304 that describe its (empty) body, not the stored response
+BODY_HEADERS = {"content-length", "content-type", "content-encoding", "transfer-encoding"}
+
+
+class CacheMiss(Exception):
+    """Offline replay asked for a response that was never cached"""
+
+
+class CachedResponse:
+    def __init__(self, url, status, headers, body, stored_at):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def age(self, now=None):
+        return (now or time.time()) - self.stored_at
+
+    def validators(self):
+        """Conditional request headers for revalidation, when the host sent any"""
+        stored = {name.lower(): value for name, value in self.headers.items()}
+        headers = {}
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last-modified"):
+            headers["If-Modified-Since"] = stored["last-modified"]
+        return headers
+
+
+def request_key(url, params=None):
+    """Normalized URL + sorted params, without the ignored ones"""
+    items = params.items() if isinstance(params, dict) else (params or [])
+    query = urlencode(sorted((str(k), str(v)) for k, v in items if k not in IGNORED_PARAMS))
+    return normalize_url(url) + ("?" + query if query else "")
+
+
+class ResponseCache:
+    """SQLite cache of HTTP responses with a TTL and LRU eviction.
+
+    Fresh entries are served without a request; stale ones are revalidated
+    with ETag / Last-Modified. In `offline` mode only cached responses are
+    replayed (whatever their age) and a miss raises CacheMiss. Safe to
+    share between threads. The SQLite file is opened (and created) on first
+    use, so a scraper module can build its cache at import time.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=MAX_BYTES, offline=OFFLINE):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    self._conn = self._connect()
+        return self._conn
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _hash(key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (self._hash(key),)
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), self._hash(key))
+            )
+            self.conn.commit()
+        url, status, headers, body, stored_at = row
+        return CachedResponse(url, status, json.loads(headers), body, stored_at)
+
+    def is_fresh(self, entry, now=None):
+        return entry.age(now) <= self.ttl
+
+    def put(self, key, status, headers, body):
+        # The key (not the final URL) is stored, so ignored params such as api_key stay off disk
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._hash(key), key, status, json.dumps(headers), body, len(body), now, now)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def touch(self, key, headers=None):
+        """A 304 answer: the stored response is fresh again, with the headers it sent.
+
+        ETag, Last-Modified, Cache-Control... of the 304 replace the stored
+        ones, so the next revalidation sends the current validators. Returns
+        the stored headers after the update (None if the key is not cached).
+        """
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT headers FROM responses WHERE key = ?", (self._hash(key),)
+            ).fetchone()
+            if not row:
+                return None
+            stored = json.loads(row[0])
+            fresh = {name: value for name, value in (headers or {}).items() if name.lower() not in BODY_HEADERS}
+            replaced = {name.lower() for name in fresh}
+            stored = {name: value for name, value in stored.items() if name.lower() not in replaced}
+            stored.update(fresh)
+            self.conn.execute(
+                "UPDATE responses SET headers = ?, stored_at = ?, accessed_at = ? WHERE key = ?",
+                (json.dumps(stored), now, now, self._hash(key))
+            )
+            self.conn.commit()
+        return stored
+
+    def _evict(self):
+        # Drop least recently used responses until the cache fits in max_bytes
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"responses": count, "bytes": size}
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+        self.conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+if __name__ == "__main__":
+    cache = ResponseCache()
+    if "--clear" in sys.argv:
+        cache.clear()
+        print("🗑️ HTTP cache cleared")
+    stats = cache.stats()
+    print(f"📦 {stats['responses']} responses, {stats['bytes'] / 1024 / 1024:.1f} MB in {cache.path}")
+    cache.close()
@@ -0,0 +1,91 @@
+import os
+from datetime import datetime
+
+from article_identity import IDENTITY_FIELD, assign_identities
+
+# --- Settings ---
+CHECKPOINT_COLLECTION = "crawl_checkpoints"
+MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "5"))
+CHECKPOINT_SIZE = 5   # identities kept from the head of the feed
+
+
+def load_checkpoint(db, source):
+    doc = db[CHECKPOINT_COLLECTION].find_one({"_id": source})
+    return set(doc.get("head", [])) if doc else set()
+
+
+def save_checkpoint(db, source, head):
+    """Remember the newest identities of `source`; call once they are stored"""
+    if not head:
+        return
+    db[CHECKPOINT_COLLECTION].update_one(
+        {"_id": source},
+        {"$set": {"head": list(head)[:CHECKPOINT_SIZE], "updated_at": datetime.now()}},
+        upsert=True
+    )
+
+
+class _NewestCrawl:
+    """State of a 'newest first' crawl, fed one page at a time"""
+
+    def __init__(self, db, source, collection):
+        self.source = source
+        self.collection = collection
+        self.checkpoint = load_checkpoint(db, source)
+        self.new_articles = []
+        self.head = []
+
+    def add_page(self, page, articles):
+        """Keep the new articles of a page; False once the crawl should stop"""
+        articles = assign_identities(articles or [])
+        if not articles:
+            return False
+        if page == 1:
+            self.head = [article[IDENTITY_FIELD] for article in articles[:CHECKPOINT_SIZE]]
+
+        identities = [article[IDENTITY_FIELD] for article in articles]
+        stored = self.checkpoint | set(
+            self.collection.distinct(IDENTITY_FIELD, {IDENTITY_FIELD: {"$in": identities}})
+        )
+
+        reached_known = False
+        for article in articles:
+            if article[IDENTITY_FIELD] in stored:
+                reached_known = True
+                break
+            self.new_articles.append(article)
+
+        print(f"📄 {self.source} page {page}: {len(articles)} articles, {len(self.new_articles)} nouveaux au total")
+        return not reached_known
+
+    def exhausted(self, max_pages):
+        print(f"⚠️ {self.source}: {max_pages} pages parcourues sans atteindre un article connu")
+
+
+def crawl_newest(db, source, collection, fetch_page, max_pages=MAX_PAGES):
+    """Walk a 'newest first' listing page by page until a known article.
+
+    `fetch_page(page)` returns the articles of a 1-based results page. The
+    crawl stops at the first article that is in the checkpoint or already
+    stored in `collection` (one $in query per page), so the number of
+    requests follows the new volume. Returns (new_articles, head) where
+    head is the checkpoint to save after writing.
+    """
+    crawl = _NewestCrawl(db, source, collection)
+    for page in range(1, max_pages + 1):
+        if not crawl.add_page(page, fetch_page(page)):
+            break
+    else:
+        crawl.exhausted(max_pages)
+    return crawl.new_articles, crawl.head
+
+
+async def crawl_newest_async(db, source, collection, fetch_page, max_pages=MAX_PAGES):
+    """crawl_newest with a coroutine `fetch_page`, to crawl alongside other requests of one event loop"""
+    crawl = _NewestCrawl(db, source, collection)
+    for page in range(1, max_pages + 1):
+        if not crawl.add_page(page, await fetch_page(page)):
+            break
+    else:
+        crawl.exhausted(max_pages)
+    return crawl.new_articles, crawl.head
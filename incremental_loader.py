@@ -0,0 +1,110 @@
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+from bson import ObjectId
+
+# --- Settings ---
+SNAPSHOT_DIR = Path("cache/snapshots")
+# ObjectIds from concurrent writers are only roughly ordered, so each delta
+# query re-reads a small window before the watermark and drops known _ids.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _snapshot_paths(name, snapshot_dir):
+    safe_name = name.replace('.', '_')
+    return snapshot_dir / f"{safe_name}.parquet", snapshot_dir / f"{safe_name}.json"
+
+
+def _read_watermark(state_path):
+    if not state_path.exists():
+        return None
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("watermark")
+    except (OSError, ValueError):
+        return None
+
+
+def _write_watermark(state_path, watermark, rows):
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump({"watermark": watermark, "rows": rows}, f)
+
+
+def _arrow_safe(df):
+    """Cast object columns to str so mixed str/int/list values fit in Parquet"""
+    for col in df.columns:
+        if df[col].dtype == object:
+            mask = df[col].notna()
+            df.loc[mask, col] = df.loc[mask, col].astype(str)
+    return df
+
+
+def _to_frame(records):
+    """Flatten Mongo documents into a DataFrame keyed by a str _id"""
+    df = pd.json_normalize(records)
+    df["_id"] = df["_id"].astype(str)
+    return df
+
+
+def _read_snapshot(snapshot_path):
+    if not snapshot_path.exists():
+        return pd.DataFrame()
+    try:
+        return pd.read_parquet(snapshot_path)
+    except Exception as e:
+        print(f"⚠️ Snapshot illisible {snapshot_path.name}, reconstruction complète : {e}")
+        return pd.DataFrame()
+
+
+def load_collection(db, name, snapshot_dir=SNAPSHOT_DIR):
+    """Load one collection from its Parquet snapshot plus a delta query on _id.
+
+    Returns (full_df, new_df, removed_df): new_df only holds the documents
+    fetched from MongoDB during this call and removed_df the snapshot rows
+    whose document no longer exists.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    snapshot_path, state_path = _snapshot_paths(name, snapshot_dir)
+    collection = db[name]
+
+    snapshot = _read_snapshot(snapshot_path)
+    watermark = _read_watermark(state_path) if not snapshot.empty else None
+
+    # Delta query: only documents inserted after the stored high-water mark
+    query = {}
+    if watermark:
+        since = ObjectId(watermark).generation_time - WATERMARK_OVERLAP
+        query = {"_id": {"$gte": ObjectId.from_datetime(since)}}
+    records = list(collection.find(query))
+
+    known_ids = set(snapshot["_id"]) if not snapshot.empty else set()
+    records = [r for r in records if str(r["_id"]) not in known_ids]
+    new_df = _to_frame(records) if records else pd.DataFrame()
+
+    full_df = pd.concat([snapshot, new_df], ignore_index=True) if not new_df.empty else snapshot
+    removed_df = pd.DataFrame()
+    changed = not new_df.empty
+
+    # Deletions (credibility filter, relevant refresh) never move the
+    # watermark, so reconcile on _id whenever the counts disagree.
+    if not full_df.empty and len(full_df) != collection.estimated_document_count():
+        live_ids = {str(doc["_id"]) for doc in collection.find({}, {"_id": 1})}
+        kept = full_df["_id"].isin(live_ids)
+        if not kept.all():
+            removed_df = full_df[~kept].reset_index(drop=True)
+            full_df = full_df[kept].reset_index(drop=True)
+            changed = True
+
+    if changed:
+        if full_df.empty:
+            snapshot_path.unlink(missing_ok=True)
+        else:
+            full_df = _arrow_safe(full_df)
+            full_df.to_parquet(snapshot_path, index=False)
+        new_watermark = full_df["_id"].max() if not full_df.empty else None
+        _write_watermark(state_path, new_watermark, len(full_df))
+
+    return full_df, new_df, removed_df
@@ -0,0 +1,130 @@
+import hashlib
+
+from pymongo import DeleteMany, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from article_identity import (IDENTITY_FIELD, assign_identities, backfill_identities, normalize_title,
+                              normalize_url, register_articles, unregister_articles)
+
+KEY_FIELD = "article_key"
+RANK_FIELD = "rank"
+DUPLICATE_KEY_ERROR = 11000
+
+_indexed_collections = set()
+
+
+# --- Article key ---
+def article_key(article):
+    """Stable key of an article from its normalized title and URL"""
+    raw = normalize_title(article.get("title")) + "\n" + normalize_url(article.get("url"))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+# --- Indexes ---
+def ensure_indexes(collection):
+    """Unique index on the article key, created once per process.
+
+    Documents stored before the key existed are keyed on the first call,
+    once the index exists: only the oldest document of each key gets it,
+    the other copies keep no key and stay outside the index.
+    """
+    if collection.full_name in _indexed_collections:
+        return
+    backfill_identities(collection)
+    collection.create_index(
+        [(KEY_FIELD, 1)], unique=True,
+        partialFilterExpression={KEY_FIELD: {"$exists": True}}
+    )
+    missing = {}
+    for doc in collection.find({KEY_FIELD: {"$exists": False}}, {"title": 1, "url": 1}).sort("_id", 1):
+        missing.setdefault(article_key(doc), doc["_id"])
+    if missing:
+        try:
+            collection.bulk_write(
+                [UpdateOne({"_id": _id}, {"$set": {KEY_FIELD: key}}) for key, _id in missing.items()],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # Only duplicates of an already keyed document are expected
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                raise
+    collection.create_index([(IDENTITY_FIELD, 1)])
+    _indexed_collections.add(collection.full_name)
+
+
+# --- Writer ---
+def write_articles(collection, articles):
+    """Insert the articles that are not stored yet, in a single bulk write.
+
+    Each article also gets its cross-source identity and is recorded in the
+    global article index. Returns (inserted, skipped).
+    """
+    if not articles:
+        return 0, 0
+    ensure_indexes(collection)
+    assign_identities(articles)
+
+    ops = {}
+    for article in articles:
+        article[KEY_FIELD] = article_key(article)
+        ops.setdefault(article[KEY_FIELD], UpdateOne(
+            {KEY_FIELD: article[KEY_FIELD]}, {"$setOnInsert": article}, upsert=True
+        ))
+
+    try:
+        inserted = collection.bulk_write(list(ops.values()), ordered=False).upserted_count
+    except BulkWriteError as e:
+        # Concurrent upserts of the same key: the loser is simply a duplicate
+        inserted = e.details.get("nUpserted", 0)
+
+    register_articles(collection.database, collection.name, articles)
+    return inserted, len(articles) - inserted
+
+
+# --- Ranked refresh ---
+def refresh_articles(collection, articles):
+    """Make `collection` hold exactly `articles`, ranked in list order.
+
+    Only the difference with the stored set is written, in one ordered bulk
+    write: inserts, then rank updates, then removals, so readers never see
+    a partially emptied collection. The global article index is kept in
+    sync. Returns (inserted, updated, removed).
+    """
+    if not articles:
+        return 0, 0, 0
+    ensure_indexes(collection)
+    assign_identities(articles)
+
+    ranked = {}
+    for article in articles:
+        article[KEY_FIELD] = article_key(article)
+        ranked.setdefault(article[KEY_FIELD], article)
+    for rank, article in enumerate(ranked.values(), start=1):
+        article[RANK_FIELD] = rank
+
+    stored = list(collection.find({}, {KEY_FIELD: 1, RANK_FIELD: 1, IDENTITY_FIELD: 1}))
+    stored_by_key = {doc[KEY_FIELD]: doc for doc in stored if KEY_FIELD in doc}
+
+    inserts, updates = [], []
+    for key, article in ranked.items():
+        doc = stored_by_key.get(key)
+        if doc is None:
+            inserts.append(article)
+        elif doc.get(RANK_FIELD) != article[RANK_FIELD]:
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {RANK_FIELD: article[RANK_FIELD]}}))
+    # Unkeyed leftovers (old duplicates) go away with the articles that left the ranking
+    removed = [doc for doc in stored if doc.get(KEY_FIELD) not in ranked]
+
+    ops = [InsertOne(article) for article in inserts] + updates
+    if removed:
+        ops.append(DeleteMany({"_id": {"$in": [doc["_id"] for doc in removed]}}))
+    if ops:
+        collection.bulk_write(ops, ordered=True)
+
+    db = collection.database
+    register_articles(db, collection.name, inserts)
+    kept = {article[IDENTITY_FIELD] for article in ranked.values()}
+    unregister_articles(db, collection.name, [
+        doc.get(IDENTITY_FIELD) for doc in removed if doc.get(IDENTITY_FIELD) not in kept
+    ])
+    return len(inserts), len(updates), len(removed)
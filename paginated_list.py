@@ -0,0 +1,66 @@
+import html
+import math
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+PAGE_SIZE = 20
+
+BOX_STYLE = """
+    height:300px;
+    overflow-y:auto;
+    padding:8px;
+    border:1px solid #ddd;
+    border-radius:4px;
+    background:{background};
+"""
+
+
+def _safe_href(url):
+    """Escaped href, limited to http(s) links"""
+    url = str(url or '')
+    if not url.lower().startswith(('http://', 'https://')):
+        return '#'
+    return html.escape(url, quote=True)
+
+
+def page_of(items, page, page_size=PAGE_SIZE):
+    """Rows of a pre-sorted frame for a 1-based page number"""
+    start = (page - 1) * page_size
+    return items.iloc[start:start + page_size]
+
+
+def render_items_html(rows, link_color, meta_color, background, empty_message="Aucun article trouvé."):
+    """HTML of one page of articles, every field escaped"""
+    parts = [f'<div style="{BOX_STYLE.format(background=background)}">']
+    if rows.empty:
+        parts.append(f"<p style='color:#777;'>{html.escape(empty_message)}</p>")
+    for title, url, label, date in zip(rows['title'], rows['url'], rows['source_label'], rows['insertion_date']):
+        ds = date.strftime('%Y-%m-%d') if hasattr(date, 'strftime') else ''
+        parts.append(f"""
+        <div style="margin-bottom:10px;">
+          <a href="{_safe_href(url)}" target="_blank" rel="noopener" style="font-weight:bold; color:{link_color}; text-decoration:none;">
+            {html.escape(str(title))}
+          </a><br>
+          <small style="color:{meta_color};">{html.escape(str(label))} — {ds}</small>
+        </div>
+        """)
+    parts.append("</div>")
+    return ''.join(parts)
+
+
+def paginated_list(items, key, link_color, meta_color, background, page_size=PAGE_SIZE):
+    """Render one page of `items` (title, url, source_label, insertion_date).
+
+    Only the selected page is turned into HTML and sent to the browser, so
+    the payload is bounded by page_size whatever the day's volume.
+    """
+    n_pages = max(1, math.ceil(len(items) / page_size))
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(
+            f"Page (1-{n_pages}) — {len(items)} articles",
+            min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page"
+        )
+    rows = page_of(items, int(page), page_size)
+    components.html(render_items_html(rows, link_color, meta_color, background), height=320)
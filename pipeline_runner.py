@@ -0,0 +1,106 @@
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+
+# --- Settings ---
+RUN_LOG_PATH = Path("cache/pipeline_runs.jsonl")
+
+
+class Job:
+    """A script of the nightly pipeline and the jobs it must wait for.
+
+    `retries` is opt-in: a retry reruns the whole script, API calls included.
+    """
+
+    def __init__(self, name, script, deps=(), retries=0, timeout=None):
+        self.name = name
+        self.script = script
+        self.deps = tuple(deps)
+        self.retries = retries
+        self.timeout = timeout
+
+
+def _run_job(job, python):
+    """Run one job (with retries) and return its result record"""
+    start = time.monotonic()
+    started_at = datetime.now()
+    returncode = None
+    error = None
+    attempts = 0
+    while attempts <= job.retries:
+        attempts += 1
+        print(f"▶️ [{job.name}] tentative {attempts}...")
+        try:
+            returncode = subprocess.run([python, job.script], timeout=job.timeout).returncode
+        except subprocess.TimeoutExpired:
+            print(f"⏱️ [{job.name}] délai dépassé ({job.timeout}s)")
+            returncode = None
+        except OSError as e:
+            # Interpreter or script not runnable: a retry would fail the same way
+            print(f"🚨 [{job.name}] lancement impossible: {e}")
+            returncode, error = None, str(e)
+            break
+        if returncode == 0:
+            break
+
+    duration = time.monotonic() - start
+    status = "success" if returncode == 0 else "failed"
+    print(f"{'✅' if status == 'success' else '❌'} [{job.name}] {status} en {duration:.1f}s")
+    return {
+        "job": job.name,
+        "script": job.script,
+        "status": status,
+        "returncode": returncode,
+        "attempts": attempts,
+        "retries": attempts - 1,
+        "error": error,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "duration_s": round(duration, 2)
+    }
+
+
+def run_pipeline(jobs, max_parallel=3, python=sys.executable, log_path=RUN_LOG_PATH):
+    """Run `jobs` as a DAG: every job starts as soon as its dependencies have
+    finished (whatever their status), with at most `max_parallel` at a time.
+    """
+    pending = {job.name: job for job in jobs}
+    for job in jobs:
+        unknown = [dep for dep in job.deps if dep not in pending]
+        if unknown:
+            raise ValueError(f"Dépendances inconnues pour {job.name}: {unknown}")
+
+    results = {}
+    running = {}
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        while pending or running:
+            ready = [job for job in pending.values() if all(dep in results for dep in job.deps)]
+            for job in ready:
+                del pending[job.name]
+                running[pool.submit(_run_job, job, python)] = job
+            if not running:
+                raise ValueError(f"Cycle de dépendances entre: {sorted(pending)}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = running.pop(future)
+                results[job.name] = future.result()
+
+    total = time.monotonic() - start
+    print(f"\n⏱️ Pipeline terminé en {total:.1f}s (somme des jobs : "
+          f"{sum(r['duration_s'] for r in results.values()):.1f}s)")
+
+    if log_path:
+        log_path = Path(log_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                "run_at": datetime.now().isoformat(timespec="seconds"),
+                "duration_s": round(total, 2),
+                "jobs": list(results.values())
+            }) + "\n")
+    return results
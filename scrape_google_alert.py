@@ -1,15 +1,20 @@
 import os
 import base64
-import json
+import time
 import pymongo
-from bs4 import BeautifulSoup
+from pathlib import Path
 from datetime import datetime
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 import os
+from domain_utils import extract_domain
+from alert_parser import iter_link_widgets
+from ingestion_writer import write_articles
+from incremental_crawl import CHECKPOINT_COLLECTION
 
 load_dotenv() 
 token_path = os.getenv("GMAIL_TOKEN_PATH")
@@ -22,6 +27,16 @@ collection = db['google_alerts_Agriculture4.0']
 # Gmail API Scope
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+ALERTS_SENDER = 'googlealerts-noreply@google.com'
+SYNC_STATE_ID = 'gmail_google_alerts'   # historyId of the last run, in CHECKPOINT_COLLECTION
+BATCH_SIZE = 50                         # Gmail advises 50 calls per batch at most (429 beyond)
+FETCH_RETRIES = 3                       # retries of the calls that failed in a batch
+RETRY_BACKOFF = 2.0                     # seconds before the first retry, doubled at each one
+# Only the headers and the HTML body are needed
+MESSAGE_FIELDS = 'id,payload(headers,parts(mimeType,body/data,parts(mimeType,body/data)))'
+# When set, the HTML of each alert is also saved there (corpus for alert_parser.py benchmarks)
+ALERTS_CORPUS_DIR = os.getenv("ALERTS_CORPUS_DIR")
+
 def get_gmail_service():
     creds = None
     if os.path.exists(token_path):
@@ -41,8 +56,19 @@ def get_gmail_service():
     service = build('gmail', 'v1', credentials=creds)
     return service
 
-def fetch_new_google_alerts(service):
-    """Fetch new Google Alert emails with pagination"""
+def load_history_id():
+    doc = db[CHECKPOINT_COLLECTION].find_one({"_id": SYNC_STATE_ID})
+    return doc.get("history_id") if doc else None
+
+def save_history_id(history_id):
+    db[CHECKPOINT_COLLECTION].update_one(
+        {"_id": SYNC_STATE_ID},
+        {"$set": {"history_id": str(history_id), "updated_at": datetime.now()}},
+        upsert=True
+    )
+
+def list_unread_alerts(service):
+    """Pages of message ids for unread Google Alerts (first run)"""
     next_page_token = None
 
     while True:
@@ -57,76 +83,186 @@ def fetch_new_google_alerts(service):
 
         results = service.users().messages().list(**query_params).execute()
         messages = results.get('messages', [])
+        if messages:
+            yield [msg['id'] for msg in messages]
 
-        if not messages:
-            print('No more Google Alerts found.')
+        next_page_token = results.get('nextPageToken')
+        if not next_page_token:
             break
 
-        for msg in messages:
-            process_message(service, msg['id'])
+def sync_from_history(service, start_history_id):
+    """Process the messages added to the inbox since `start_history_id`, page by page.
+
+    Returns the mailbox historyId to resume from: `start_history_id` again
+    if some messages could not be fetched, so that the next run reads them.
+    """
+    next_page_token = None
+    history_id = start_history_id
+    failed = []
+
+    while True:
+        query_params = {
+            'userId': 'me',
+            'startHistoryId': start_history_id,
+            'historyTypes': ['messageAdded'],
+            'labelId': 'INBOX'
+        }
+
+        if next_page_token:
+            query_params['pageToken'] = next_page_token
+
+        results = service.users().history().list(**query_params).execute()
+        history_id = results.get('historyId', history_id)
+        message_ids = [
+            added['message']['id']
+            for record in results.get('history', [])
+            for added in record.get('messagesAdded', [])
+        ]
+        if message_ids:
+            failed += process_messages(service, list(dict.fromkeys(message_ids)))
 
         next_page_token = results.get('nextPageToken')
         if not next_page_token:
             break
 
-def process_message(service, message_id):
-    """Fetch and process one email"""
-    msg_data = service.users().messages().get(userId='me', id=message_id, format='full').execute()
-    payload = msg_data.get('payload', {})
-    parts = payload.get('parts', [])
-    html_content = ""
+    if failed:
+        print(f"⚠️ {len(failed)} messages not fetched, historyId kept for the next run.")
+        return start_history_id
+    return history_id
 
-    for part in parts:
-        if part['mimeType'] == 'text/html':
-            html_content = part['body']['data']
+def fetch_messages(service, message_ids):
+    """Get messages through the batch endpoint, BATCH_SIZE calls per HTTP request.
+
+    Calls failing inside a batch (mostly 429s) are retried with exponential
+    backoff. Returns (messages, ids still failing after FETCH_RETRIES).
+    """
+    messages = []
+    errors = {}
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            messages.append(response)
+
+    pending = list(message_ids)
+    for attempt in range(FETCH_RETRIES + 1):
+        if attempt:
+            delay = RETRY_BACKOFF * 2 ** (attempt - 1)
+            print(f"⚠️ {len(pending)} messages failed, retrying in {delay:.0f} s...")
+            time.sleep(delay)
+        errors.clear()
+        for i in range(0, len(pending), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for message_id in pending[i:i + BATCH_SIZE]:
+                batch.add(
+                    service.users().messages().get(userId='me', id=message_id, format='full', fields=MESSAGE_FIELDS),
+                    request_id=message_id
+                )
+            batch.execute()
+        pending = [message_id for message_id in pending if message_id in errors]
+        if not pending:
             break
-        elif part.get('parts'):
-            for subpart in part['parts']:
-                if subpart['mimeType'] == 'text/html':
-                    html_content = subpart['body']['data']
-                    break
 
-    if html_content:
-        html_content = base64.urlsafe_b64decode(html_content).decode('utf-8')
-        extract_articles_from_json(html_content)
+    for message_id in pending:
+        print(f"❌ Failed to fetch message {message_id}: {errors[message_id]}")
+    return messages, pending
 
-def extract_articles_from_json(html_content):
-    """Extract Title, Description, URL, and add Source + Date from the embedded JSON"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    script_tag = soup.find('script', {'type': 'application/json'})
+def html_part(payload):
+    """Base64 data of the text/html part of a message payload"""
+    for part in payload.get('parts', []):
+        if part['mimeType'] == 'text/html':
+            return part['body'].get('data', '')
+        for subpart in part.get('parts', []):
+            if subpart['mimeType'] == 'text/html':
+                return subpart['body'].get('data', '')
+    return ''
 
-    if not script_tag:
-        print("⚠️ No JSON script found in email.")
-        return
+def is_google_alert(message):
+    headers = message.get('payload', {}).get('headers', [])
+    return any(
+        header['name'].lower() == 'from' and ALERTS_SENDER in header['value'] for header in headers
+    )
+
+def process_messages(service, message_ids):
+    """Extract the cards of a page of emails and store them in one bulk write.
+
+    Returns the ids of the messages that could not be fetched.
+    """
+    messages, failed = fetch_messages(service, message_ids)
+    articles = []
+    for message in messages:
+        if not is_google_alert(message):
+            continue
+        html_content = html_part(message.get('payload', {}))
+        if html_content:
+            html_content = base64.urlsafe_b64decode(html_content).decode('utf-8')
+            if ALERTS_CORPUS_DIR:
+                Path(ALERTS_CORPUS_DIR).mkdir(parents=True, exist_ok=True)
+                (Path(ALERTS_CORPUS_DIR) / f"{message['id']}.html").write_text(html_content, encoding='utf-8')
+            articles += extract_articles_from_json(html_content)
 
-    try:
-        data = json.loads(script_tag.string)
-    except json.JSONDecodeError:
-        print("⚠️ Failed to parse JSON.")
+    inserted, skipped = write_articles(collection, articles)
+    print(f"✅ {len(messages)} emails: {inserted} new articles ({skipped} already stored).")
+    return failed
+
+def fetch_new_google_alerts(service):
+    """Process the Google Alerts received since the previous run.
+
+    The mailbox historyId is kept between runs, and only moves forward
+    once every message was fetched; the first run (or one whose historyId
+    has expired) falls back to the unread alerts.
+    """
+    history_id = load_history_id()
+
+    if history_id:
+        try:
+            save_history_id(sync_from_history(service, history_id))
+            return
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            print("⚠️ History too old, falling back to unread alerts.")
+
+    # Mailbox position taken before listing, so nothing received meanwhile is lost
+    history_id = service.users().getProfile(userId='me').execute()['historyId']
+    found = False
+    failed = []
+    for message_ids in list_unread_alerts(service):
+        found = True
+        failed += process_messages(service, message_ids)
+    if not found:
+        print('No more Google Alerts found.')
+    if failed:
+        # The unread alerts are listed again by the next run
+        print(f"⚠️ {len(failed)} messages not fetched, historyId not saved.")
         return
+    save_history_id(history_id)
 
+def extract_articles_from_json(html_content):
+    """Extract Title, Description, URL, and add Source + Date from the embedded JSON"""
     # Use current date for all articles
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    cards = data.get('cards', [])
-    for card in cards:
-        widgets = card.get('widgets', [])
-        for widget in widgets:
-            if widget.get('type') == 'LINK':
-                title = widget.get('title', '')
-                description = widget.get('description', '')
-                url = widget.get('url', '')
-
-                if title and url:
-                    article_data = {
-                        'title': title,
-                        'description': description,
-                        'url': url,
-                        'source': "Google Alerts",
-                        'date': current_date
-                    }
-                    print(article_data)
-                    collection.insert_one(article_data)
+    articles = []
+    for widget in iter_link_widgets(html_content):
+        title = widget.get('title', '')
+        description = widget.get('description', '')
+        url = widget.get('url', '')
+
+        if title and url:
+            article_data = {
+                'title': title,
+                'description': description,
+                'url': url,
+                'source': "Google Alerts",
+                'domain': extract_domain(url, "Google Alerts"),
+                'date': current_date
+            }
+            print(article_data)
+            articles.append(article_data)
+
+    return articles
 
 if __name__ == '__main__':
     service = get_gmail_service()
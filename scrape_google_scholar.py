@@ -1,10 +1,13 @@
-import requests
 import random
-import time
 from datetime import datetime
 from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
+from domain_utils import extract_domain
+from ingestion_writer import refresh_articles, write_articles
+from async_fetch import fetch_all
+from http_cache import ResponseCache
+from incremental_crawl import crawl_newest, save_checkpoint
 
 load_dotenv() 
 
@@ -15,6 +18,11 @@ MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "veille_agriculture"
 RELEVANT_COLLECTION = "scholar_agriculture_4_0_relevant"
 NEWEST_COLLECTION = "scholar_agriculture_4_0_newest"
+SERPAPI_URL = "https://serpapi.com/search"
+RESULTS_PER_PAGE = 20
+PAGES = int(os.getenv("SCHOLAR_PAGES", "1"))  # each page costs one SerpAPI credit
+# Identical queries are answered from disk instead of spending credits again
+HTTP_CACHE = ResponseCache()
 
 # --- User-Agents ---
 user_agents = [
@@ -30,31 +38,8 @@ db = client[DB_NAME]
 relevant_collection = db[RELEVANT_COLLECTION]
 newest_collection = db[NEWEST_COLLECTION]
 
-# --- Function to search and collect articles ---
-def search_google_scholar(query, scisbd_value):
-    search_mode = "newest" if scisbd_value in [1, 2] else "relevance"
-    print(f"🔎 Searching [{search_mode}] articles...")
-
-    params = {
-        "engine": "google_scholar",
-        "q": query,
-        "hl": "en",
-        "num": "20",
-        "api_key": SERPAPI_API_KEY,
-        "scisbd": scisbd_value
-    }
-
-    headers = {
-        "User-Agent": random.choice(user_agents)
-    }
-
-    # Simulate human behavior
-    time.sleep(random.uniform(2, 5))
-
-    response = requests.get("https://serpapi.com/search", headers=headers, params=params)
-    time.sleep(random.uniform(1, 3))
-
-    data = response.json()
+# --- Function to parse one SerpAPI response ---
+def parse_results(data, search_mode):
     articles = []
     current_date = datetime.now().strftime("%Y-%m-%d")
 
@@ -71,6 +56,7 @@ def search_google_scholar(query, scisbd_value):
                 "source": "Google Scholar",
                 "title": title,
                 "url": url,
+                "domain": extract_domain(url, "Google Scholar"),
                 "snippet": snippet,
                 "publication_info": publication_info,
                 "citations": citations,
@@ -83,27 +69,59 @@ def search_google_scholar(query, scisbd_value):
 
     return articles
 
-# --- Fetch articles ---
-relevant_articles = search_google_scholar(QUERY, scisbd_value=0)
-newest_articles = search_google_scholar(QUERY, scisbd_value=2)
-
-# --- Insert Relevant Articles (refresh all) ---
-if relevant_articles:
-    relevant_collection.delete_many({})
-    relevant_collection.insert_many(relevant_articles)
-    print(f"✅ {len(relevant_articles)} relevant articles inserted into '{RELEVANT_COLLECTION}'.")
-else:
-    print("⚠️ No relevant articles to insert.")
-
-# --- Insert Newest Articles (insert only new) ---
-inserted_count = 0
-for article in newest_articles:
-    if not newest_collection.find_one({"title": article["title"]}):
-        newest_collection.insert_one(article)
-        inserted_count += 1
+# --- Function to search and collect articles ---
+def search_google_scholar(query, scisbd_values, pages=PAGES, first_page=1):
+    """Run every (sort mode, page) query concurrently; returns {scisbd: [articles]}"""
+    page_requests = []
+    for scisbd_value in scisbd_values:
+        for page in range(first_page - 1, first_page - 1 + pages):
+            params = {
+                "engine": "google_scholar",
+                "q": query,
+                "hl": "en",
+                "num": str(RESULTS_PER_PAGE),
+                "start": str(page * RESULTS_PER_PAGE),
+                "api_key": SERPAPI_API_KEY,
+                "scisbd": str(scisbd_value)
+            }
+            page_requests.append((scisbd_value, (SERPAPI_URL, params)))
 
-print(f"✅ {inserted_count} new newest articles inserted into '{NEWEST_COLLECTION}'.")
+    headers = {
+        "User-Agent": random.choice(user_agents)
+    }
+    print(f"🔎 Searching {len(page_requests)} SerpAPI pages...")
+    responses = fetch_all([request for _, request in page_requests], headers=headers, rate=2, burst=4, cache=HTTP_CACHE)
+
+    results = {scisbd_value: [] for scisbd_value in scisbd_values}
+    for (scisbd_value, _), response in zip(page_requests, responses):
+        search_mode = "newest" if scisbd_value in [1, 2] else "relevance"
+        if isinstance(response, Exception) or response.status != 200:
+            print(f"❌ SerpAPI [{search_mode}] request failed: {getattr(response, 'status', response)}")
+            continue
+        results[scisbd_value] += parse_results(response.json(), search_mode)
+    return results
+
+if __name__ == "__main__":
+    # --- Fetch articles ---
+    relevant_articles = search_google_scholar(QUERY, scisbd_values=[0])[0]
+
+    # Newest: one page (one credit) at a time, until the last article seen
+    newest_articles, newest_head = crawl_newest(
+        db, NEWEST_COLLECTION, newest_collection,
+        lambda page: search_google_scholar(QUERY, scisbd_values=[2], pages=1, first_page=page)[2]
+    )
+
+    # --- Refresh Relevant Articles (only the ranking changes are written) ---
+    if relevant_articles:
+        inserted_count, updated_count, removed_count = refresh_articles(relevant_collection, relevant_articles)
+        print(f"✅ '{RELEVANT_COLLECTION}' refreshed: {inserted_count} added, {updated_count} re-ranked, {removed_count} removed.")
+    else:
+        print("⚠️ No relevant articles to insert.")
 
-client.close()
+    # --- Insert Newest Articles (insert only new) ---
+    inserted_count, skipped_count = write_articles(newest_collection, newest_articles)
+    save_checkpoint(db, NEWEST_COLLECTION, newest_head)
 
+    print(f"✅ {inserted_count} new newest articles inserted into '{NEWEST_COLLECTION}' ({skipped_count} already stored).")
 
+    client.close()
@@ -1,14 +1,21 @@
-import random
-import time
+import os
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from pymongo import MongoClient
+from dotenv import load_dotenv
+from async_fetch import fetch_all
+from browser_pool import BrowserPool
+from selenium_extract import IEEE_RESULT_SELECTOR, extract_ieee_results, wait_for_results
+from ingestion_writer import refresh_articles, write_articles
+from domain_utils import extract_domain
+from incremental_crawl import crawl_newest, save_checkpoint
+
+load_dotenv()
+
+# IEEE Xplore Metadata Search API (JSON), used first when a key is configured
+IEEE_API_URL = os.getenv("IEEE_API_URL", "https://ieeexploreapi.ieee.org/api/v1/search/articles")
+IEEE_API_KEY = os.getenv("IEEE_API_KEY")
+API_QUERY = "Agriculture 4.0"
+API_PAGE_SIZE = 25   # same as a search results page
 
 # List of User-Agents
 USER_AGENTS = [
@@ -18,75 +25,87 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.6099.199 Safari/537.36",
 ]
 
-def get_driver():
-    chrome_options = Options()
-    user_agent = random.choice(USER_AGENTS)
-    chrome_options.add_argument(f"user-agent={user_agent}")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--start-maximized")
-    
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    return driver
+def parse_api_articles(data):
+    """Articles of one API response, with the same fields as the browser scrape"""
+    if "articles" not in data and "total_records" not in data:
+        # Error payloads come back as JSON too, without any result count
+        raise ValueError(f"unexpected API response: {str(data)[:200]}")
+    current_date = datetime.now().strftime("%Y-%m-%d")
+
+    articles = []
+    for item in data.get("articles", []):
+        article_number = item.get("article_number")
+        article_url = item.get("html_url") or (
+            f"https://ieeexplore.ieee.org/document/{article_number}/" if article_number else "No URL"
+        )
+        authors = "; ".join(
+            author.get("full_name", "") for author in item.get("authors", {}).get("authors", [])
+        )
+        year = item.get("publication_year")
+
+        articles.append({
+            "source": "IEEE Xplore",
+            "title": item.get("title") or "No Title",
+            "url": article_url,
+            "domain": extract_domain(article_url, "IEEE Xplore"),
+            "authors": authors or "No Authors",
+            "conference": item.get("publication_title") or "No Conference",
+            "year": f"Year: {year}" if year else "No Year",
+            "date":current_date
+        })
+    return articles
 
-def fetch_articles(url):
-    driver = get_driver()
+def fetch_articles_json(newest, page=1):
+    """One results page through the API; raises if the request fails"""
+    params = {
+        "querytext": API_QUERY,
+        "apikey": IEEE_API_KEY,
+        "format": "json",
+        "max_records": str(API_PAGE_SIZE),
+        "start_record": str((page - 1) * API_PAGE_SIZE + 1)
+    }
+    if newest:
+        # Article numbers grow with publication in Xplore
+        params.update(sort_field="article_number", sort_order="desc")
+
+    response = fetch_all([(IEEE_API_URL, params)])[0]
+    if isinstance(response, Exception):
+        raise response
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status}")
+    return parse_api_articles(response.json())
+
+def fetch_articles(url, pool):
+    with pool.session() as driver:
+        return _fetch_articles(driver, url)
+
+def _fetch_articles(driver, url):
     driver.get(url)
 
-    try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'div.result-item-align h3 a'))
-        )
-    except:
+    # Results are rendered client-side: wait for the first title link
+    if not wait_for_results(driver, IEEE_RESULT_SELECTOR + ' h3 a'):
         print(f"❌ Timeout loading articles from {url}")
-        driver.quit()
         return []
 
-    time.sleep(random.uniform(3, 6))
-
-    results = driver.find_elements(By.CSS_SELECTOR, 'div.result-item-align')
+    # All fields of the page in a single execute_script round-trip
+    results = extract_ieee_results(driver)
     print(f"Found {len(results)} articles from {url}")
     
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    articles = []
-
-    for item in results:
-        try:
-            title_elem = item.find_element(By.CSS_SELECTOR, 'h3 a')
-            title = title_elem.text
-            article_url = title_elem.get_attribute('href')
-        except:
-            title, article_url = "No Title", "No URL"
-
-        try:
-            authors = item.find_element(By.CSS_SELECTOR, 'p.author').text
-        except:
-            authors = "No Authors"
-
-        try:
-            conference = item.find_element(By.CSS_SELECTOR, 'div.description a').text
-        except:
-            conference = "No Conference"
-
-        try:
-            year = item.find_element(By.XPATH, ".//span[contains(text(),'Year:')]").text
-        except:
-            year = "No Year"
-
-        articles.append({
+    return [
+        {
             "source": "IEEE Xplore",
-            "title": title,
-            "url": article_url,
-            "authors": authors,
-            "conference": conference,
-            "year": year,
+            "title": result["title"],
+            "url": result["url"],
+            "domain": extract_domain(result["url"], "IEEE Xplore"),
+            "authors": result["authors"],
+            "conference": result["conference"],
+            "year": result["year"],
             "date":current_date
-        })
-
-    driver.quit()
-    return articles
+        }
+        for result in results
+    ]
 
 # MongoDB setup
 client = MongoClient("mongodb://localhost:27017/")
@@ -98,26 +117,39 @@ relevant_collection = db["ieee_agriculture_4_0_relevant"]
 newest_url = "https://ieeexplore.ieee.org/search/searchresult.jsp?queryText=Agriculture%204.0&highlight=true&returnType=SEARCH&returnFacets=ALL&sortType=newest"
 relevant_url = "https://ieeexplore.ieee.org/search/searchresult.jsp?queryText=Agriculture%204.0&highlight=true&returnType=SEARCH&returnFacets=ALL"
 
-# Fetch newest
-newest_articles = fetch_articles(newest_url)
-
-newest_to_insert = []
-for article in newest_articles:
-    if not newest_collection.find_one({"title": article["title"], "url": article["url"]}):
-        newest_to_insert.append(article)
-
-if newest_to_insert:
-    newest_collection.insert_many(newest_to_insert)
-    print(f"✅ {len(newest_to_insert)} new 'newest' articles inserted into MongoDB.")
-else:
-    print("⚠️ No new 'newest' articles to insert.")
-
-# Fetch relevant
-relevant_articles = fetch_articles(relevant_url)
-
-if relevant_articles:
-    relevant_collection.delete_many({})
-    relevant_collection.insert_many(relevant_articles)
-    print(f"✅ Replaced 'relevant' articles collection with {len(relevant_articles)} articles.")
-else:
-    print("⚠️ No 'relevant' articles found to insert.")
+def fetch_page(pool, newest, page=1):
+    """JSON API first; the browser only when it is not configured or fails"""
+    if IEEE_API_KEY:
+        try:
+            return fetch_articles_json(newest, page)
+        except Exception as e:
+            print(f"⚠️ IEEE API failed ({e}), falling back to the browser.")
+    url = newest_url if newest else relevant_url
+    return fetch_articles(f"{url}&pageNumber={page}" if page > 1 else url, pool)
+
+if __name__ == "__main__":
+    # One warm browser pool for both queries (Chrome only starts if the API route fails)
+    with BrowserPool(user_agents=USER_AGENTS) as pool:
+        # Fetch newest pages until the last article seen by the previous run
+        newest_articles, newest_head = crawl_newest(
+            db, newest_collection.name, newest_collection, lambda page: fetch_page(pool, True, page)
+        )
+
+        # Insert only new articles (one bulk upsert on the unique article key)
+        inserted, skipped = write_articles(newest_collection, newest_articles)
+        save_checkpoint(db, newest_collection.name, newest_head)
+
+        if inserted:
+            print(f"✅ {inserted} new 'newest' articles inserted into MongoDB ({skipped} already stored).")
+        else:
+            print("⚠️ No new 'newest' articles to insert.")
+
+        # Fetch relevant
+        relevant_articles = fetch_page(pool, False)
+
+    if relevant_articles:
+        # Only the ranking changes are written, readers never see an empty collection
+        inserted, updated, removed = refresh_articles(relevant_collection, relevant_articles)
+        print(f"✅ Refreshed 'relevant' articles: {inserted} added, {updated} re-ranked, {removed} removed.")
+    else:
+        print("⚠️ No 'relevant' articles found to insert.")
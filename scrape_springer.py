@@ -1,9 +1,18 @@
+import asyncio
+import os
 import random
-import time
 from datetime import datetime
-import requests
+from urllib.parse import urlsplit
 from bs4 import BeautifulSoup
 from pymongo import MongoClient
+from dotenv import load_dotenv
+from domain_utils import extract_domain
+from ingestion_writer import write_articles
+from async_fetch import AsyncFetcher
+from http_cache import ResponseCache
+from incremental_crawl import crawl_newest_async, save_checkpoint
+
+load_dotenv()
 
 # MongoDB Setup
 client = MongoClient("mongodb://localhost:27017/")
@@ -18,30 +27,32 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:113.0) Gecko/20100101 Firefox/113.0"
 ]
 
-def fetch_articles(url, collection_name):
-    headers = {
-        "User-Agent": random.choice(USER_AGENTS),
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive"
-    }
-
-    # Random human-like delay
-    time.sleep(random.uniform(2, 5))
-
-    response = requests.get(url, headers=headers)
-
-    # Another small random wait
-    time.sleep(random.uniform(1, 3))
-
-    soup = BeautifulSoup(response.content, "html.parser")
-    base_url = "https://link.springer.com"
-
+SEARCH_URL = "https://link.springer.com/search"
+BASE_URL = "https://link.springer.com"
+SEARCH_PARAMS = [
+    ("new-search", "true"), ("query", "agriculture 4.0"),
+    ("content-type", "article"), ("content-type", "research")
+]
+PAGES = int(os.getenv("SPRINGER_PAGES", "2"))
+# Politeness towards link.springer.com: one request every 2 s on average, bursts of 2
+SPRINGER_RATE = (0.5, 2)
+# One token bucket per host for the whole run, shared by every fetcher
+BUCKETS = {}
+# Search pages already downloaded today are replayed (HTTP_CACHE_TTL, HTTP_CACHE_OFFLINE)
+HTTP_CACHE = ResponseCache()
+
+# Springer Nature Meta API (JSON), used first when a key is configured
+SPRINGER_API_URL = os.getenv("SPRINGER_API_URL", "https://api.springernature.com/meta/v2/json")
+SPRINGER_API_KEY = os.getenv("SPRINGER_API_KEY")
+API_QUERY = '"agriculture 4.0" type:Journal'
+API_PAGE_SIZE = 20   # same as a search results page
+# sortBy of the search page -> query constraint of the API
+API_SORTS = {"newestFirst": " sort:date", "relevance": ""}
+
+def parse_articles(content):
+    """Articles of one Springer search results page"""
+    soup = BeautifulSoup(content, "html.parser")
     results = soup.select('li[data-test="search-result-item"]')
-    print(f"Found {len(results)} articles for {collection_name}.")
-
-    collection = db[collection_name]
-    
     current_date = datetime.now().strftime("%Y-%m-%d")
 
     articles = []
@@ -53,7 +64,7 @@ def fetch_articles(url, collection_name):
             authors_tag = item.select_one('span[data-test="authors"]')
 
             title = title_tag.get_text(strip=True) if title_tag else "No Title"
-            url_article = base_url + title_tag['href'] if title_tag and title_tag.has_attr('href') else "No URL"
+            url_article = BASE_URL + title_tag['href'] if title_tag and title_tag.has_attr('href') else "No URL"
             description = desc_tag.get_text(strip=True) if desc_tag else "No Description"
             published_date = date_tag.get_text(strip=True) if date_tag else "No Date"
             authors = authors_tag.get_text(strip=True) if authors_tag else "No Authors"
@@ -62,31 +73,175 @@ def fetch_articles(url, collection_name):
                 "source": "SpringerLink",
                 "title": title,
                 "url": url_article,
+                "domain": extract_domain(url_article, "SpringerLink"),
                 "description": description,
                 "authors": authors,
                 "published": published_date,
                 "date":current_date
             }
 
-            # Insert only if not already existing
-            if not collection.find_one({"title": title, "url": url_article}):
-                articles.append(article)
+            articles.append(article)
 
         except Exception as e:
             print(f"❌ Error parsing an article: {e}")
 
-    if articles:
-        collection.insert_many(articles)
-        print(f"✅ {len(articles)} new articles inserted into '{collection_name}'.")
+    return articles
+
+def _api_abstract(record):
+    # Plain string, or {"h1": "Abstract", "p": "..."} depending on the record
+    abstract = record.get("abstract")
+    if isinstance(abstract, dict):
+        abstract = abstract.get("p")
+    if isinstance(abstract, list):
+        abstract = " ".join(abstract)
+    return abstract or "No Description"
+
+def parse_api_records(data):
+    """Articles of one Meta API response, with the same fields as parse_articles"""
+    if "records" not in data:
+        # Error payloads come back as JSON too, without any records
+        raise ValueError(f"unexpected API response: {str(data)[:200]}")
+    current_date = datetime.now().strftime("%Y-%m-%d")
+
+    articles = []
+    for record in data["records"]:
+        doi = record.get("doi")
+        urls = [url.get("value") for url in record.get("url", []) if url.get("value")]
+        url_article = f"{BASE_URL}/article/{doi}" if doi else (urls[0] if urls else "No URL")
+        authors = ", ".join(creator.get("creator", "") for creator in record.get("creators", []))
+        published_date = record.get("publicationDate") or "No Date"
+        try:
+            # Same format as the search page ("05 March 2024")
+            published_date = datetime.strptime(published_date, "%Y-%m-%d").strftime("%d %B %Y")
+        except ValueError:
+            pass
+
+        articles.append({
+            "source": "SpringerLink",
+            "title": record.get("title") or "No Title",
+            "url": url_article,
+            "domain": extract_domain(url_article, "SpringerLink"),
+            "description": _api_abstract(record),
+            "authors": authors or "No Authors",
+            "published": published_date,
+            "date":current_date
+        })
+    return articles
+
+def springer_fetcher():
+    """Pooled client for the search pages and the API, on the run's shared BUCKETS"""
+    headers = {
+        "User-Agent": random.choice(USER_AGENTS),
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+    return AsyncFetcher(
+        headers=headers, host_rates={urlsplit(SEARCH_URL).netloc: SPRINGER_RATE},
+        cache=HTTP_CACHE, buckets=BUCKETS
+    )
+
+def _run(search, *args):
+    async def run():
+        async with springer_fetcher() as fetcher:
+            return await search(fetcher, *args)
+    return asyncio.run(run())
+
+async def fetch_articles_json_async(fetcher, searches, pages=PAGES, first_page=1):
+    """fetch_articles through the Meta API; raises if any page fails"""
+    page_requests = [
+        (collection_name, (SPRINGER_API_URL, {
+            "q": API_QUERY + API_SORTS[sort_by],
+            "s": str((page - 1) * API_PAGE_SIZE + 1),
+            "p": str(API_PAGE_SIZE),
+            "api_key": SPRINGER_API_KEY
+        }))
+        for collection_name, sort_by in searches.items()
+        for page in range(first_page, first_page + pages)
+    ]
+    responses = await fetcher.get_many([request for _, request in page_requests])
+
+    results = {collection_name: [] for collection_name in searches}
+    for (collection_name, _), response in zip(page_requests, responses):
+        if isinstance(response, Exception):
+            raise response
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        results[collection_name] += parse_api_records(response.json())
+    return results
+
+async def search_articles_async(fetcher, searches, pages=PAGES, first_page=1):
+    """JSON API first; the search pages only when it is not configured or fails"""
+    if SPRINGER_API_KEY:
+        try:
+            return await fetch_articles_json_async(fetcher, searches, pages, first_page)
+        except Exception as e:
+            print(f"⚠️ Springer API failed ({e}), falling back to the search pages.")
+    return await fetch_articles_async(fetcher, searches, pages, first_page)
+
+async def fetch_articles_async(fetcher, searches, pages=PAGES, first_page=1):
+    """Fetch every (sort order, page) concurrently over the fetcher's pooled connections.
+
+    `searches` maps a collection name to its Springer sortBy value; returns
+    {collection_name: [articles]}.
+    """
+    page_requests = [
+        (collection_name, (SEARCH_URL, SEARCH_PARAMS + [("sortBy", sort_by), ("page", str(page))]))
+        for collection_name, sort_by in searches.items()
+        for page in range(first_page, first_page + pages)
+    ]
+    responses = await fetcher.get_many([request for _, request in page_requests])
+
+    results = {collection_name: [] for collection_name in searches}
+    for (collection_name, (url, params)), response in zip(page_requests, responses):
+        page = dict(params)["page"]
+        if isinstance(response, Exception) or response.status != 200:
+            print(f"❌ Page {page} of '{collection_name}' failed: {getattr(response, 'status', response)}")
+            continue
+        results[collection_name] += parse_articles(response.body)
+    return results
+
+# Synchronous entry points: one fetcher (and event loop) per call, same BUCKETS
+def fetch_articles_json(searches, pages=PAGES, first_page=1):
+    return _run(fetch_articles_json_async, searches, pages, first_page)
+
+def search_articles(searches, pages=PAGES, first_page=1):
+    return _run(search_articles_async, searches, pages, first_page)
+
+def fetch_articles(searches, pages=PAGES, first_page=1):
+    return _run(fetch_articles_async, searches, pages, first_page)
+
+def store_articles(collection_name, articles):
+    print(f"Found {len(articles)} articles for {collection_name}.")
+    collection = db[collection_name]
+
+    # Insert only if not already existing (one bulk upsert on the unique article key)
+    inserted, skipped = write_articles(collection, articles)
+    if inserted:
+        print(f"✅ {inserted} new articles inserted into '{collection_name}' ({skipped} already stored).")
     else:
         print(f"⚠️ No new articles to insert for '{collection_name}'.")
 
 # --- Main ---
 
-# URLs
-newest_url = "https://link.springer.com/search?new-search=true&query=agriculture+4.0&content-type=article&content-type=research&sortBy=newestFirst"
-relevant_url = "https://link.springer.com/search?new-search=true&query=agriculture+4.0&content-type=article&content-type=research&sortBy=relevance"
+NEWEST_COLLECTION = "springer_agriculture_4_0_newest"
+RELEVANT_COLLECTION = "springer_agriculture_4_0_relevant"
+
+async def crawl_springer(fetcher):
+    """(relevant articles, new 'newest' articles, newest checkpoint head) in one event loop.
+
+    The relevant pages are fetched while "newest" is crawled page by page
+    until the last article seen by the previous run.
+    """
+    async def fetch_newest_page(page):
+        results = await search_articles_async(fetcher, {NEWEST_COLLECTION: "newestFirst"}, 1, page)
+        return results[NEWEST_COLLECTION]
+
+    relevant = asyncio.create_task(search_articles_async(fetcher, {RELEVANT_COLLECTION: "relevance"}))
+    newest_articles, head = await crawl_newest_async(db, NEWEST_COLLECTION, db[NEWEST_COLLECTION], fetch_newest_page)
+    return (await relevant)[RELEVANT_COLLECTION], newest_articles, head
+
+if __name__ == "__main__":
+    relevant_articles, newest_articles, head = _run(crawl_springer)
 
-# Fetch both
-fetch_articles(newest_url, "springer_agriculture_4_0_newest")
-fetch_articles(relevant_url, "springer_agriculture_4_0_relevant")
+    store_articles(NEWEST_COLLECTION, newest_articles)
+    save_checkpoint(db, NEWEST_COLLECTION, head)
+    store_articles(RELEVANT_COLLECTION, relevant_articles)
@@ -1,14 +1,10 @@
-import random
-import time
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from pymongo import MongoClient
+from browser_pool import BrowserPool
+from selenium_extract import WILEY_RESULT_SELECTOR, extract_wiley_results, wait_for_results
+from ingestion_writer import write_articles
+from domain_utils import extract_domain
+from incremental_crawl import crawl_newest, save_checkpoint
 
 # Setup MongoDB
 client = MongoClient("mongodb://localhost:27017/")
@@ -21,87 +17,62 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"
 ]
 
-def create_driver():
-    options = Options()
-    user_agent = random.choice(USER_AGENTS)
-    options.add_argument(f"user-agent={user_agent}")
-    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+def scrape_wiley(url, collection_name, pool):
+    with pool.session() as driver:
+        return _scrape_wiley(driver, url, collection_name)
 
-def scrape_wiley(url, collection_name):
-    driver = create_driver()
+def _scrape_wiley(driver, url, collection_name):
     driver.get(url)
 
-    try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'li.search__item'))
-        )
-    except:
+    if not wait_for_results(driver, WILEY_RESULT_SELECTOR):
         print(f"❌ Timeout while loading {collection_name}.")
-        driver.quit()
-        return
+        return []
 
-    time.sleep(random.uniform(3, 6))
-
-    articles = []
-    results = driver.find_elements(By.CSS_SELECTOR, 'li.search__item')
+    # All fields of the page in a single execute_script round-trip
+    results = extract_wiley_results(driver)
     print(f"Found {len(results)} articles for {collection_name}.")
 
-    collection = db[collection_name]
-    
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-
-    for item in results:
-        try:
-            title_elem = item.find_element(By.CSS_SELECTOR, 'h2.meta__title a')
-            title = title_elem.text
-            url = title_elem.get_attribute('href')
-        except:
-            title, url = "No Title", "No URL"
-
-        try:
-            authors = item.find_element(By.CSS_SELECTOR, 'div.meta__authors').text
-        except:
-            authors = "No Authors"
-
-        try:
-            journal = item.find_element(By.CSS_SELECTOR, 'a.publication_meta_serial').text
-        except:
-            journal = "No Journal"
-
-        try:
-            publication_date = item.find_element(By.CSS_SELECTOR, 'p.meta__epubDate').text.replace("First published: ", "")
-        except:
-            publication_date = "No Date"
-
-        article = {
+    return [
+        {
             "source": "Wiley Online Library",
-            "title": title,
-            "url": url,
-            "authors": authors,
-            "journal": journal,
-            "publication_date": publication_date,
+            "title": result["title"],
+            "url": result["url"],
+            "domain": extract_domain(result["url"], "Wiley Online Library"),
+            "authors": result["authors"],
+            "journal": result["journal"],
+            "publication_date": result["publication_date"],
             "date":current_date
         }
-
-        # Insert only if not already existing
-        if not collection.find_one({"title": title, "url": url}):
-            articles.append(article)
-
-    driver.quit()
-
-    if articles:
-        collection.insert_many(articles)
-        print(f"✅ Inserted {len(articles)} new articles into '{collection_name}'.")
+        for result in results
+    ]
+
+def store_articles(collection_name, articles):
+    # Insert only if not already existing (one bulk upsert on the unique article key)
+    inserted, skipped = write_articles(db[collection_name], articles)
+    if inserted:
+        print(f"✅ Inserted {inserted} new articles into '{collection_name}' ({skipped} already stored).")
     else:
         print(f"⚠️ No new articles to insert for '{collection_name}'.")
 
 # --- Main ---
 
 # URLs
-earliest_url = "https://onlinelibrary.wiley.com/action/doSearch?AllField=Agriculture+4.0&startPage=0&sortBy=Earliest"
+earliest_url = "https://onlinelibrary.wiley.com/action/doSearch?AllField=Agriculture+4.0&startPage={start_page}&sortBy=Earliest"
 relevant_url = "https://onlinelibrary.wiley.com/action/doSearch?AllField=Agriculture+4.0&startPage=0&sortBy=relevancy"
 
-# Scrape both
-scrape_wiley(earliest_url, "wiley_agriculture_4_0_newest")
-scrape_wiley(relevant_url, "wiley_agriculture_4_0_relevant")
+NEWEST_COLLECTION = "wiley_agriculture_4_0_newest"
+RELEVANT_COLLECTION = "wiley_agriculture_4_0_relevant"
+
+# Scrape both with the same warm browser
+with BrowserPool(user_agents=USER_AGENTS) as pool:
+    # Newest: walk the pages (startPage is 0-based) until the last article seen
+    newest_articles, newest_head = crawl_newest(
+        db, NEWEST_COLLECTION, db[NEWEST_COLLECTION],
+        lambda page: scrape_wiley(earliest_url.format(start_page=page - 1), NEWEST_COLLECTION, pool)
+    )
+    store_articles(NEWEST_COLLECTION, newest_articles)
+    save_checkpoint(db, NEWEST_COLLECTION, newest_head)
+
+    store_articles(RELEVANT_COLLECTION, scrape_wiley(relevant_url, RELEVANT_COLLECTION, pool))
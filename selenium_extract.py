@@ -0,0 +1,125 @@
+import functools
+import http.server
+import sys
+import threading
+import time
+from pathlib import Path
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# --- Settings ---
+READY_TIMEOUT = 15
+FIXTURES_DIR = Path("cache") / "fixtures"
+
+IEEE_RESULT_SELECTOR = 'div.result-item-align'
+WILEY_RESULT_SELECTOR = 'li.search__item'
+
+# Every field of every result, read in the page: one WebDriver round-trip
+_TEXT_JS = """
+const clean = el => el ? el.textContent.replace(/\\s+/g, ' ').trim() : null;
+const text = (root, selector) => clean(root.querySelector(selector));
+"""
+
+IEEE_RESULTS_JS = _TEXT_JS + """
+return Array.from(document.querySelectorAll(arguments[0])).map(item => {
+    const link = item.querySelector('h3 a');
+    const year = Array.from(item.querySelectorAll('span')).find(span => span.textContent.includes('Year:'));
+    return {
+        title: clean(link),
+        url: link ? link.href : null,
+        authors: text(item, 'p.author'),
+        conference: text(item, 'div.description a'),
+        year: clean(year)
+    };
+});
+"""
+
+WILEY_RESULTS_JS = _TEXT_JS + """
+return Array.from(document.querySelectorAll(arguments[0])).map(item => {
+    const link = item.querySelector('h2.meta__title a');
+    const published = text(item, 'p.meta__epubDate');
+    return {
+        title: clean(link),
+        url: link ? link.href : null,
+        authors: text(item, 'div.meta__authors'),
+        journal: text(item, 'a.publication_meta_serial'),
+        publication_date: published === null ? null : published.replace('First published: ', '')
+    };
+});
+"""
+
+
+def _default(value, default):
+    return default if value is None else value
+
+
+def wait_for_results(driver, selector, timeout=READY_TIMEOUT):
+    """Wait until the result list is in the DOM; False on timeout"""
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+        return True
+    except Exception:
+        return False
+
+
+def extract_ieee_results(driver):
+    """Raw fields of the IEEE Xplore results of the current page"""
+    return [
+        {
+            "title": _default(row["title"], "No Title"),
+            "url": _default(row["url"], "No URL") if row["title"] is not None else "No URL",
+            "authors": _default(row["authors"], "No Authors"),
+            "conference": _default(row["conference"], "No Conference"),
+            "year": _default(row["year"], "No Year"),
+        }
+        for row in driver.execute_script(IEEE_RESULTS_JS, IEEE_RESULT_SELECTOR)
+    ]
+
+
+def extract_wiley_results(driver):
+    """Raw fields of the Wiley Online Library results of the current page"""
+    return [
+        {
+            "title": _default(row["title"], "No Title"),
+            "url": _default(row["url"], "No URL") if row["title"] is not None else "No URL",
+            "authors": _default(row["authors"], "No Authors"),
+            "journal": _default(row["journal"], "No Journal"),
+            "publication_date": _default(row["publication_date"], "No Date"),
+        }
+        for row in driver.execute_script(WILEY_RESULTS_JS, WILEY_RESULT_SELECTOR)
+    ]
+
+
+EXTRACTORS = {
+    "ieee": (IEEE_RESULT_SELECTOR, extract_ieee_results),
+    "wiley": (WILEY_RESULT_SELECTOR, extract_wiley_results),
+}
+
+
+if __name__ == "__main__":
+    # Run the extractors on saved result pages served locally:
+    #   python selenium_extract.py [fixtures_dir]   (files named ieee*.html / wiley*.html)
+    from browser_pool import BrowserPool
+
+    fixtures_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else FIXTURES_DIR
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(fixtures_dir))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with BrowserPool() as pool, pool.session() as driver:
+        for name, (selector, extract) in EXTRACTORS.items():
+            for fixture in sorted(fixtures_dir.glob(f"{name}*.html")):
+                driver.get(f"{base_url}/{fixture.name}")
+                if not wait_for_results(driver, selector):
+                    print(f"❌ {fixture.name}: no results found")
+                    continue
+                start = time.perf_counter()
+                rows = extract(driver)
+                elapsed = time.perf_counter() - start
+                print(f"✅ {fixture.name}: {len(rows)} results in {elapsed * 1e3:.1f} ms")
+                for row in rows[:3]:
+                    print(f"   {row}")
+    server.shutdown()
@@ -0,0 +1,253 @@
+import codecs
+import mmap
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+# --- Settings ---
+MMAP_THRESHOLD = 8 * 1024 * 1024     # larger exports are read through mmap
+MAX_TITLE_CHARS = 100_000           # bound of the lines kept while waiting for a date line
+
+# Reference: the historical regex over the whole file. The lazy DOTALL title
+# backtracks over the rest of the file at each start position of a malformed
+# export, hence quadratic time; kept to verify the streaming parser.
+EXPORT_RE = re.compile(
+    r'(?P<title>.+?)\n'
+    r'(?P<date>\d{2}/\d{2}/\d{2},? \d{2}:\d{2})'
+    r'(?:\s?[|,]\s?)'
+    r'(?P<country>.+?)'
+    r'(?:\s?[|,]\s?)'
+    r'(?P<source>.+?)(?:\n|$)',
+    re.DOTALL | re.MULTILINE
+)
+
+# The same pattern from the start of a date line, once per form of the first
+# separator, in the order the regex tries them (greedy \s? first)
+DATE_PATTERN = r'(?P<date>\d{2}/\d{2}/\d{2},? \d{2}:\d{2})'
+FIRST_SEPARATORS = (r'\s[|,]\s', r'\s[|,]', r'[|,]\s', r'[|,]')
+TAIL_RES = tuple(
+    re.compile(
+        DATE_PATTERN + f'(?:{separator})' + r'(?P<country>.+?)(?:\s?[|,]\s?)(?P<source>.+?)(?:\n|$)',
+        re.DOTALL | re.MULTILINE
+    )
+    for separator in FIRST_SEPARATORS
+)
+HEAD_RES = tuple(re.compile(DATE_PATTERN + f'(?:{separator})') for separator in FIRST_SEPARATORS)
+DATE_RE = re.compile(DATE_PATTERN)
+
+CHUNK_SIZE = 1024 * 1024
+MAX_LOOKAHEAD_LINES = 50   # lines a malformed country / source may spill over
+LOOKAHEAD_MARGIN = 4       # lines after a spilled match that may still change it
+
+
+def iter_lines(buffer, hasher=None, chunk_size=CHUNK_SIZE):
+    """Decoded lines of a binary stream (file or mmap), with text-mode universal newlines.
+
+    Read by chunks; `hasher` (hashlib object) is fed with the raw bytes.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    rest = ''
+    while True:
+        chunk = buffer.read(chunk_size)
+        if hasher is not None and chunk:
+            hasher.update(chunk)
+        text = rest + decoder.decode(chunk, final=not chunk)
+        if chunk and text.endswith('\r'):
+            # Maybe the first half of a \r\n split between two chunks
+            text, rest = text[:-1], '\r'
+        else:
+            rest = ''
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        if not chunk:
+            # Like str.split: a final newline gives a last empty line
+            yield from lines
+            return
+        rest = lines.pop() + rest
+        yield from lines
+
+
+def split_lines(text):
+    """Lines of a decoded export, as iter_lines gives them"""
+    return text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+
+
+def _match_spilled(tail_re, window, next_line, max_lookahead):
+    # Grows `window` (a list of lines) in place, next_line() giving None at
+    # the end of the export; the match, or None
+    exhausted = False
+    while True:
+        match = tail_re.match('\n'.join(window))
+        if match:
+            last = match.group(0).count('\n', 0, match.end('source'))
+            if exhausted or len(window) - 1 - last >= LOOKAHEAD_MARGIN:
+                return match
+        elif exhausted or len(window) > max_lookahead:
+            return None
+        line = next_line()
+        if line is None:
+            exhausted = True
+        else:
+            window.append(line)
+
+
+def _match_date_line(window, next_line, max_lookahead):
+    """Date, country and source starting at window[0], as EXPORT_RE would read them.
+
+    Each form of the first separator is tried in turn, like the regex
+    backtracking does. A match ending a line that cannot spill over is final;
+    otherwise country and source may run over the next lines and are matched
+    on a window read ahead (see _match_spilled).
+    """
+    line = window[0]
+    date = DATE_RE.match(line)
+    if date is None:
+        return None
+    if len(line) - date.end() < 3:
+        # The first separator (3 characters at most) may go on over the next lines
+        while len(window) < 3:
+            following = next_line()
+            if following is None:
+                break
+            window.append(following)
+    head = '\n'.join(window[:3])
+
+    for tail_re, head_re in zip(TAIL_RES, HEAD_RES):
+        if not head_re.match(head):
+            continue
+        match = tail_re.match(line)
+        if match and line[-1] not in ' \t|,':
+            return match
+        match = _match_spilled(tail_re, window, next_line, max_lookahead)
+        if match:
+            return match
+    return None
+
+
+def iter_records(lines, max_lookahead=MAX_LOOKAHEAD_LINES):
+    """Yield (title, date, country, source) for each article, in a single pass.
+
+    State machine over lines, equivalent to EXPORT_RE: every line is kept as
+    a pending title line until a date line closes the article, the title
+    being the pending lines joined with \\n. A date line right after the
+    previous article (empty title) belongs to the next title. When country
+    or source spill over the following lines (malformed export), up to
+    `max_lookahead` lines are read ahead, where the regex would scan to the
+    end of the file: that bound is what keeps the parser linear.
+    """
+    lines = iter(lines)
+    ahead = deque()        # lines read ahead and given back
+    pending = deque()
+    pending_chars = 0
+    first_tail = TAIL_RES[0]   # ' | ' : the separator of well-formed exports
+
+    def next_line():
+        if ahead:
+            return ahead.popleft()
+        return next(lines, None)
+
+    while True:
+        if ahead:
+            line = ahead.popleft()
+        else:
+            line = next(lines, None)
+            if line is None:
+                return
+
+        if line[:1].isdigit() and (len(pending) > 1 or (pending and pending[0])):
+            match = first_tail.match(line)
+            if match and line[-1] not in ' \t|,':
+                # Well-formed date line: nothing on the next lines can change the match
+                yield ('\n'.join(pending),) + match.group('date', 'country', 'source')
+                pending.clear()
+                pending_chars = 0
+                continue
+
+            window = [line]
+            match = _match_date_line(window, next_line, max_lookahead)
+            if match:
+                used = match.group(0).count('\n', 0, match.end('source')) + 1
+                ahead.extendleft(reversed(window[used:]))
+                yield ('\n'.join(pending),) + match.group('date', 'country', 'source')
+                pending.clear()
+                pending_chars = 0
+                continue
+            ahead.extendleft(reversed(window[1:]))
+
+        pending.append(line)
+        pending_chars += len(line) + 1
+        # Memory stays bounded on exports without any date line
+        while pending_chars > MAX_TITLE_CHARS and len(pending) > 1:
+            pending_chars -= len(pending.popleft()) + 1
+
+
+def iter_file_records(file_path, hasher=None, chunk_size=CHUNK_SIZE):
+    """iter_records over a file, streamed (or mapped in memory past MMAP_THRESHOLD)"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from iter_records(iter_lines(mapped, hasher, chunk_size))
+        else:
+            yield from iter_records(iter_lines(f, hasher, chunk_size))
+
+
+def iter_records_regex(text):
+    for match in EXPORT_RE.finditer(text):
+        yield match.group('title'), match.group('date'), match.group('country'), match.group('source')
+
+
+def _read_text(file_path):
+    # What the importer used to do: text mode, universal newlines
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def _synthetic_export(n_articles):
+    countries = ["France", "Germany", "Brazil", "United States", "Kenya"]
+    return "".join(
+        f"[Talkwalker Alerts] Agriculture 4.0\nIcon Capteurs connectés n°{i} pour la ferme de demain...\n"
+        f"{1 + i % 28:02d}/{1 + i % 12:02d}/24 {i % 24:02d}:{i % 60:02d} | {countries[i % 5]} | "
+        f"https://www.site{i % 500}.com/article-{i}?utm_source=talkwalker\n"
+        for i in range(n_articles)
+    )
+
+
+def _timed(label, size, parse):
+    start = time.perf_counter()
+    count = sum(1 for _ in parse())
+    elapsed = time.perf_counter() - start
+    print(f"{label:>28} : {elapsed * 1e3:9.1f} ms, {size / elapsed / 1e6:7.1f} MB/s ({count} articles)")
+
+
+if __name__ == "__main__":
+    # python talkwalker_parser.py [corpus_dir]: equivalence on a corpus of real exports, then
+    # throughput (tests/test_talkwalker_parser.py checks the fixture corpus of tests/fixtures/talkwalker)
+    if len(sys.argv) > 1:
+        files = sorted(Path(sys.argv[1]).glob("*.txt")) + sorted(Path(sys.argv[1]).glob("*.TXT"))
+        mismatches = 0
+        for path in files:
+            expected = list(iter_records_regex(_read_text(path)))
+            if list(iter_file_records(path)) != expected:
+                mismatches += 1
+                print(f"❌ {path.name}: différent de la regex")
+        print(f"✅ {len(files) - mismatches} / {len(files)} fichiers identiques à la regex")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export = Path(tmp) / "export.txt"
+        export.write_text(_synthetic_export(200_000), encoding='utf-8')
+        size = export.stat().st_size
+        assert list(iter_file_records(export)) == list(iter_records_regex(_read_text(export)))
+        _timed("regex (fichier entier)", size, lambda: iter_records_regex(_read_text(export)))
+        _timed("flux ligne à ligne", size, lambda: iter_file_records(export))
+
+        # Malformed export (date lines without any separator): the regex scans
+        # to the end of the file from every position, the parser reads it once
+        for lines in (250, 500, 1000):
+            malformed = Path(tmp) / f"malformed-{lines}.txt"
+            malformed.write_text("titre sans séparateur\n01/01/24 10:00 France\n" * (lines // 2), encoding='utf-8')
+            size = malformed.stat().st_size
+            _timed(f"regex, mal formé ({lines} l.)", size, lambda: iter_records_regex(_read_text(malformed)))
+            _timed(f"flux, mal formé ({lines} l.)", size, lambda: iter_file_records(malformed))
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class StubServer:
+    """aiohttp server on localhost, in its own thread, answering canned responses.
+
+    `respond(path, body, status, delay, content_type, headers)` registers
+    the answer of a path; every request is logged in `requests` as
+    (path, query, host, time), and its headers in `request_headers`.
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        self.request_headers = []
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._started = threading.Event()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def respond(self, path, body=b"", status=200, delay=0, content_type="text/html", headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.responses[path] = (status, body, delay, content_type, headers)
+
+    def respond_fixture(self, path, name, status=200):
+        content_type = "application/json" if name.endswith(".json") else "text/html"
+        self.respond(path, (FIXTURES_DIR / name).read_bytes(), status, content_type=content_type)
+
+    async def _handle(self, request):
+        self.requests.append((request.path, dict(request.query), request.host, time.monotonic()))
+        self.request_headers.append(dict(request.headers))
+        status, body, delay, content_type, headers = self.responses.get(
+            request.path, (404, b"", 0, "text/plain", None))
+        if delay:
+            await asyncio.sleep(delay)
+        if status == 304:
+            return web.Response(status=status, headers=headers)
+        return web.Response(status=status, body=body, content_type=content_type, headers=headers)
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self.port = self._runner.addresses[0][1]
+        self._started.set()
+        self._loop.run_forever()
+
+    def start(self):
+        self._thread.start()
+        self._started.wait(5)
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer().start()
+    yield server
+    server.stop()
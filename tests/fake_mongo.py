@@ -0,0 +1,303 @@
+"""In-memory stand-in for the few pymongo calls the writers make.
+
+Enough of MongoDB for the tests: equality / $exists / $in / $size filters,
+$set / $setOnInsert / $addToSet / $pull updates, replacements, bulk_write (ordered or
+not), $match / $project / $sort aggregations and unique indexes, partial
+ones included, raising the same errors (code 11000) as the server.
+"""
+import copy
+import itertools
+
+from bson import ObjectId
+from pymongo import DeleteMany, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY_ERROR = 11000
+_MISSING = object()
+
+
+def _get(doc, field):
+    value = doc
+    for part in field.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _matches_value(value, condition):
+    if isinstance(condition, dict) and any(key.startswith('$') for key in condition):
+        for op, arg in condition.items():
+            if op == '$exists':
+                if (value is not _MISSING) != bool(arg):
+                    return False
+            elif op == '$in':
+                if value is _MISSING or (value not in arg and not (
+                        isinstance(value, list) and any(item in arg for item in value))):
+                    return False
+            elif op == '$size':
+                if not isinstance(value, list) or len(value) != arg:
+                    return False
+            else:
+                raise NotImplementedError(op)
+        return True
+    if isinstance(value, list) and not isinstance(condition, list):
+        return condition in value
+    return value is not _MISSING and value == condition
+
+
+def _sort_key(value):
+    # Missing and null fields sort first, as on the server
+    return (0,) if value is _MISSING or value is None else (1, value)
+
+
+def _evaluate(doc, expression):
+    if isinstance(expression, str) and expression.startswith('$'):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict) and '$ifNull' in expression:
+        values = (_evaluate(doc, item) for item in expression['$ifNull'])
+        return next((value for value in values if value is not None), None)
+    if isinstance(expression, dict) and any(key.startswith('$') for key in expression):
+        raise NotImplementedError(next(iter(expression)))
+    return expression
+
+
+def _project(doc, projection):
+    projected = {} if projection.get('_id', 1) in (0, False) else {'_id': doc['_id']}
+    for field, spec in projection.items():
+        if field == '_id':
+            continue
+        if spec in (1, True):
+            if field in doc:
+                projected[field] = doc[field]
+        elif spec not in (0, False):
+            projected[field] = _evaluate(doc, spec)
+    return projected
+
+
+def matches(doc, filter_):
+    for field, condition in (filter_ or {}).items():
+        if field == '$or':
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif not _matches_value(_get(doc, field), condition):
+            return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+        self.docs = []
+        self.indexes = []   # (field, partial filter) of the unique indexes
+
+    # --- Reads ---
+    def find(self, filter_=None, projection=None):
+        found = [copy.deepcopy(doc) for doc in self.docs if matches(doc, filter_)]
+        if projection:
+            keep = {field for field, on in projection.items() if on} | {'_id'}
+            found = [{k: v for k, v in doc.items() if k in keep} for doc in found]
+        return _Cursor(found)
+
+    def find_one(self, filter_=None, projection=None):
+        return next(iter(self.find(filter_, projection)), None)
+
+    def count_documents(self, filter_):
+        return sum(1 for doc in self.docs if matches(doc, filter_))
+
+    def distinct(self, field, filter_=None):
+        values = []
+        for doc in self.docs:
+            value = _get(doc, field)
+            if matches(doc, filter_) and value is not _MISSING and value not in values:
+                values.append(value)
+        return values
+
+    def aggregate(self, pipeline):
+        docs = [copy.deepcopy(doc) for doc in self.docs]
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == '$match':
+                docs = [doc for doc in docs if matches(doc, arg)]
+            elif op == '$sort':
+                # Stable sorts from the last key to the first
+                for field, direction in reversed(list(arg.items())):
+                    docs.sort(key=lambda doc: _sort_key(_get(doc, field)), reverse=direction < 0)
+            elif op == '$project':
+                docs = [_project(doc, arg) for doc in docs]
+            else:
+                raise NotImplementedError(op)
+        return iter(docs)
+
+    # --- Indexes ---
+    def create_index(self, keys, unique=False, partialFilterExpression=None, **kwargs):
+        field = keys[0][0]
+        if unique:
+            seen = set()
+            for doc in self.docs:
+                if partialFilterExpression is None or matches(doc, partialFilterExpression):
+                    value = _get(doc, field)
+                    value = None if value is _MISSING else value
+                    if value in seen:
+                        raise DuplicateKeyError(f"E11000 duplicate key error index: {field}_1",
+                                                DUPLICATE_KEY_ERROR)
+                    seen.add(value)
+            if (field, partialFilterExpression) not in self.indexes:
+                self.indexes.append((field, partialFilterExpression))
+        return f"{field}_1"
+
+    def _check_unique(self, candidate, ignore=None):
+        for field, partial in self.indexes:
+            if partial is not None and not matches(candidate, partial):
+                continue
+            value = _get(candidate, field)
+            for doc in self.docs:
+                if doc is ignore or (partial is not None and not matches(doc, partial)):
+                    continue
+                if _get(doc, field) == value:
+                    raise DuplicateKeyError(f"E11000 duplicate key error: {field}", DUPLICATE_KEY_ERROR)
+
+    # --- Writes ---
+    def _insert(self, doc):
+        doc.setdefault('_id', ObjectId())
+        stored = copy.deepcopy(doc)
+        self._check_unique(stored)
+        self.docs.append(stored)
+
+    @staticmethod
+    def _apply(doc, update, inserting):
+        for op, fields in update.items():
+            if op == '$setOnInsert' and not inserting:
+                continue
+            for field, value in fields.items():
+                if op in ('$set', '$setOnInsert'):
+                    doc[field] = copy.deepcopy(value)
+                elif op == '$addToSet':
+                    doc.setdefault(field, [])
+                    if value not in doc[field]:
+                        doc[field].append(value)
+                elif op == '$pull':
+                    doc[field] = [item for item in doc.get(field, []) if item != value]
+                else:
+                    raise NotImplementedError(op)
+
+    def _update(self, filter_, update, upsert=False, many=False):
+        """(matched, upserted _id or None)"""
+        targets = [doc for doc in self.docs if matches(doc, filter_)]
+        if not many:
+            targets = targets[:1]
+        for doc in targets:
+            updated = copy.deepcopy(doc)
+            self._apply(updated, update, inserting=False)
+            self._check_unique(updated, ignore=doc)
+            doc.clear()
+            doc.update(updated)
+        if targets or not upsert:
+            return len(targets), None
+        doc = {k: copy.deepcopy(v) for k, v in filter_.items() if not k.startswith('$')}
+        self._apply(doc, update, inserting=True)
+        self._insert(doc)
+        return 0, doc['_id']
+
+    def _replace(self, filter_, replacement, upsert=False):
+        """(matched, upserted _id or None)"""
+        target = next((doc for doc in self.docs if matches(doc, filter_)), None)
+        if target is None:
+            if not upsert:
+                return 0, None
+            doc = copy.deepcopy(replacement)
+            if '_id' in filter_:
+                doc.setdefault('_id', filter_['_id'])
+            self._insert(doc)
+            return 0, doc['_id']
+        replaced = dict(copy.deepcopy(replacement), _id=target['_id'])
+        self._check_unique(replaced, ignore=target)
+        target.clear()
+        target.update(replaced)
+        return 1, None
+
+    def _delete(self, filter_):
+        before = len(self.docs)
+        self.docs = [doc for doc in self.docs if not matches(doc, filter_)]
+        return before - len(self.docs)
+
+    def insert_one(self, doc):
+        self._insert(doc)
+
+    def insert_many(self, docs, ordered=True):
+        result = self.bulk_write([InsertOne(doc) for doc in docs], ordered=ordered)
+        result.inserted_ids = [doc['_id'] for doc in docs][:result.inserted_count]
+        return result
+
+    def update_one(self, filter_, update, upsert=False):
+        self._update(filter_, update, upsert)
+
+    def update_many(self, filter_, update):
+        self._update(filter_, update, many=True)
+
+    def delete_many(self, filter_):
+        return _BulkResult({'nInserted': 0, 'nUpserted': 0, 'nMatched': 0, 'nRemoved': self._delete(filter_)})
+
+    def bulk_write(self, operations, ordered=True):
+        counts = {'nInserted': 0, 'nUpserted': 0, 'nMatched': 0, 'nRemoved': 0}
+        errors = []
+        for position, operation in enumerate(operations):
+            try:
+                if isinstance(operation, InsertOne):
+                    self._insert(operation._doc)
+                    counts['nInserted'] += 1
+                elif isinstance(operation, UpdateOne):
+                    matched, upserted = self._update(operation._filter, operation._doc, operation._upsert)
+                    counts['nMatched'] += matched
+                    counts['nUpserted'] += upserted is not None
+                elif isinstance(operation, ReplaceOne):
+                    matched, upserted = self._replace(operation._filter, operation._doc, operation._upsert)
+                    counts['nMatched'] += matched
+                    counts['nUpserted'] += upserted is not None
+                elif isinstance(operation, DeleteMany):
+                    counts['nRemoved'] += self._delete(operation._filter)
+                else:
+                    raise NotImplementedError(type(operation).__name__)
+            except DuplicateKeyError as e:
+                errors.append({'index': position, 'code': DUPLICATE_KEY_ERROR, 'errmsg': str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError(dict(counts, writeErrors=errors))
+        return _BulkResult(counts)
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, field, direction=1):
+        self._docs.sort(key=lambda doc: _get(doc, field), reverse=direction < 0)
+        return self
+
+    def __iter__(self):
+        return iter(self._docs)
+
+
+class _BulkResult:
+    def __init__(self, counts):
+        self.inserted_count = counts['nInserted']
+        self.upserted_count = counts['nUpserted']
+        self.matched_count = counts['nMatched']
+        self.deleted_count = counts['nRemoved']
+
+
+class FakeDatabase:
+    _ids = itertools.count()
+
+    def __init__(self, name=None):
+        self.name = name or f"test_{next(self._ids)}"
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self, name)
+        return self._collections[name]
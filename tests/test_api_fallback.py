@@ -0,0 +1,175 @@
+import http.server
+import shutil
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import scrape_ieee
+import scrape_springer
+from api_stub_server import StubHandler
+
+from conftest import FIXTURES_DIR
+
+# Responses the JSON route must not trust: (body, status)
+UNUSABLE_RESPONSES = {
+    "forbidden": (b'{"error": "Developer Inactive"}', 403),
+    "rate_limited": (b'{"error": "Account Over Queries Per Second Limit"}', 429),
+    "empty_body": (b"", None),
+    "empty_json": (b"{}", None),
+}
+
+
+class ApiStub:
+    """api_stub_server replaying the recordings of a temporary directory"""
+
+    def __init__(self, recordings_dir):
+        self.recordings_dir = recordings_dir
+        self.queries = []
+        stub = self
+
+        class Handler(StubHandler):
+            def do_GET(self):
+                stub.queries.append(parse_qs(urlsplit(self.path).query))
+                super().do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        Handler.recordings_dir = recordings_dir
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def record(self, name, body, status=None):
+        (self.recordings_dir / name).write_bytes(body)
+        if status:
+            (self.recordings_dir / name).with_suffix(".status").write_text(str(status))
+
+    def record_fixture(self, name, fixture):
+        shutil.copy(FIXTURES_DIR / fixture, self.recordings_dir / name)
+
+
+@pytest.fixture
+def api_stub(tmp_path):
+    stub = ApiStub(tmp_path).start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def springer_api(api_stub, monkeypatch):
+    monkeypatch.setattr(scrape_springer, "SPRINGER_API_URL", api_stub.base_url + "/json")
+    monkeypatch.setattr(scrape_springer, "SPRINGER_API_KEY", "test-key")
+    monkeypatch.setattr(scrape_springer, "HTTP_CACHE", None)
+    monkeypatch.setattr(scrape_springer, "BUCKETS", {})
+    return api_stub
+
+
+@pytest.fixture
+def ieee_api(api_stub, monkeypatch):
+    monkeypatch.setattr(scrape_ieee, "IEEE_API_URL", api_stub.base_url + "/articles")
+    monkeypatch.setattr(scrape_ieee, "IEEE_API_KEY", "test-key")
+    browser_urls = []
+
+    def fetch_with_browser(url, pool):
+        browser_urls.append(url)
+        return [{"title": "From the browser"}]
+
+    monkeypatch.setattr(scrape_ieee, "fetch_articles", fetch_with_browser)
+    api_stub.browser_urls = browser_urls
+    return api_stub
+
+
+# --- Springer Nature Meta API ---
+
+def test_springer_api_records_map_onto_the_search_page_fields(springer_api, stub_server, monkeypatch):
+    springer_api.record_fixture("json-1.json", "springer_meta_api.json")
+    monkeypatch.setattr(scrape_springer, "SEARCH_URL", stub_server.base_url + "/search")
+
+    results = scrape_springer.search_articles({"springer_newest": "newestFirst"}, pages=1)
+
+    assert stub_server.requests == []
+    query, = springer_api.queries
+    assert (query["q"], query["s"], query["api_key"]) == (
+        ['"agriculture 4.0" type:Journal sort:date'], ["1"], ["test-key"])
+    first, second = results["springer_newest"]
+    assert {key: first[key] for key in ("source", "title", "url", "domain", "description", "authors", "published")} == {
+        "source": "SpringerLink",
+        "title": "Digital twins for Agriculture 4.0",
+        "url": "https://link.springer.com/article/10.1007/s11119-024-10111-1",
+        "domain": "link.springer.com",
+        "description": "A review of digital twin platforms for farms.",
+        "authors": "Martin, A., Rossi, B.",
+        "published": "05 March 2024",
+    }
+    assert (second["url"], second["description"], second["authors"], second["published"]) == (
+        "https://link.springer.com/chapter/10.1007/978-3-031-24861-0_7",
+        "Field trials of soil moisture driven irrigation.", "No Authors", "2024")
+
+
+@pytest.mark.parametrize("response", UNUSABLE_RESPONSES)
+def test_springer_falls_back_to_the_search_pages(response, springer_api, stub_server, monkeypatch):
+    springer_api.record("json-1.json", *UNUSABLE_RESPONSES[response])
+    stub_server.respond_fixture("/search", "springer_search.html")
+    monkeypatch.setattr(scrape_springer, "SEARCH_URL", stub_server.base_url + "/search")
+
+    results = scrape_springer.search_articles({"springer_relevant": "relevance"}, pages=1)
+
+    assert len(springer_api.queries) == 1
+    assert [query["sortBy"] for _, query, _, _ in stub_server.requests] == ["relevance"]
+    assert results["springer_relevant"][0]["title"] == "Digital twins for Agriculture 4.0"
+
+
+# --- IEEE Xplore Metadata Search API ---
+
+def test_ieee_api_articles_map_onto_the_browser_fields(ieee_api):
+    ieee_api.record_fixture("articles-1.json", "ieee_xplore_api.json")
+
+    articles = scrape_ieee.fetch_page(None, newest=True)
+
+    assert ieee_api.browser_urls == []
+    query, = ieee_api.queries
+    assert (query["querytext"], query["start_record"], query["sort_field"], query["apikey"]) == (
+        ["Agriculture 4.0"], ["1"], ["article_number"], ["test-key"])
+    first, second = articles
+    assert {key: first[key] for key in ("source", "title", "url", "domain", "authors", "conference", "year")} == {
+        "source": "IEEE Xplore",
+        "title": "IoT sensing for Agriculture 4.0",
+        "url": "https://ieeexplore.ieee.org/document/10456789/",
+        "domain": "ieeexplore.ieee.org",
+        "authors": "Ana Silva; Kofi Mensah",
+        "conference": "2024 IEEE Conference on AgriFood Electronics",
+        "year": "Year: 2024",
+    }
+    assert (second["url"], second["authors"], second["conference"], second["year"]) == (
+        "https://ieeexplore.ieee.org/document/10450001/", "No Authors", "No Conference", "No Year")
+
+
+def test_ieee_page_without_results_is_not_an_error(ieee_api):
+    ieee_api.record("articles-26.json", b'{"total_records": 25, "total_searched": 6134512}')
+
+    assert scrape_ieee.fetch_page(None, newest=True, page=2) == []
+    assert ieee_api.browser_urls == []
+
+
+@pytest.mark.parametrize("response", UNUSABLE_RESPONSES)
+def test_ieee_falls_back_to_the_browser(response, ieee_api):
+    ieee_api.record("articles-1.json", *UNUSABLE_RESPONSES[response])
+
+    articles = scrape_ieee.fetch_page("pool", newest=False)
+
+    assert len(ieee_api.queries) == 1
+    assert ieee_api.browser_urls == [scrape_ieee.relevant_url]
+    assert articles == [{"title": "From the browser"}]
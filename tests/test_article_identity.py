@@ -0,0 +1,36 @@
+from article_identity import (IDENTITY_FIELD, INDEX_COLLECTION, article_identity, register_articles,
+                              unregister_articles)
+
+from fake_mongo import FakeDatabase
+
+
+def test_identity_prefers_the_doi():
+    article = {"title": "Smart farming", "url": "https://link.springer.com/article/10.1007/S123-024-0001-2"}
+    assert article_identity(article) == "doi:10.1007/s123-024-0001-2"
+
+
+def test_identity_ignores_tracking_parameters_and_case():
+    first = {"title": "Smart Farming!", "url": "https://Example.org/a/?utm_source=alert"}
+    second = {"titre": "smart farming", "lien": "https://example.org/a"}
+    assert article_identity(first) == article_identity(second)
+
+
+def test_unregister_keeps_identities_still_in_the_collection():
+    db = FakeDatabase()
+    collection = db["google_alerts"]
+    old_copy = {"title": "Smart farming", "url": "https://example.org/a"}
+    old_copy[IDENTITY_FIELD] = article_identity(old_copy)
+    other = {"title": "Drones", "url": "https://example.org/b"}
+    other[IDENTITY_FIELD] = article_identity(other)
+    collection.insert_many([old_copy, dict(old_copy), other])
+    register_articles(db, collection.name, [old_copy, other])
+
+    # One copy of each article is deleted (e.g. quarantined), an older copy of the first remains
+    duplicate = collection.find_one({"title": "Smart farming"})
+    collection.delete_many({"_id": duplicate["_id"]})
+    collection.delete_many({"title": "Drones"})
+    unregister_articles(db, collection.name, [old_copy[IDENTITY_FIELD], other[IDENTITY_FIELD]])
+
+    index = db[INDEX_COLLECTION]
+    assert index.find_one({"_id": old_copy[IDENTITY_FIELD]})["sources"] == ["google_alerts"]
+    assert index.find_one({"_id": other[IDENTITY_FIELD]}) is None
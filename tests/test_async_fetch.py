@@ -0,0 +1,167 @@
+import asyncio
+import socket
+
+import aiohttp
+
+import scrape_google_scholar
+import scrape_springer
+from article_identity import IDENTITY_FIELD, assign_identities
+from async_fetch import FetchResult, fetch_all
+from incremental_crawl import save_checkpoint
+
+from conftest import FIXTURES_DIR
+from fake_mongo import FakeDatabase
+
+
+def _spans_by_host(server):
+    times = {}
+    for _, _, host, at in server.requests:
+        times.setdefault(host.split(':')[0], []).append(at)
+    return {host: max(ats) - min(ats) for host, ats in times.items()}
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_token_bucket_spaces_requests_of_one_host(stub_server):
+    stub_server.respond("/ok", "ok")
+
+    results = fetch_all([(stub_server.base_url + "/ok", None)] * 4, rate=5, burst=1)
+
+    assert [result.status for result in results] == [200] * 4
+    # burst of 1, then one token every 0.2 s
+    assert _spans_by_host(stub_server)["127.0.0.1"] >= 0.55
+
+
+def test_each_host_has_its_own_bucket(stub_server):
+    stub_server.respond("/ok", "ok")
+    other_host = f"http://localhost:{stub_server.port}/ok"
+
+    fetch_all([(stub_server.base_url + "/ok", None), (other_host, None)] * 2, rate=5, burst=1)
+
+    spans = _spans_by_host(stub_server)
+    assert set(spans) == {"127.0.0.1", "localhost"}
+    assert all(0.15 <= span < 0.4 for span in spans.values())
+
+
+def test_host_rates_override_the_default(stub_server):
+    stub_server.respond("/ok", "ok")
+
+    fetch_all([(stub_server.base_url + "/ok", None)] * 5, rate=1, burst=1,
+              host_rates={f"127.0.0.1:{stub_server.port}": (50, 5)})
+
+    assert _spans_by_host(stub_server)["127.0.0.1"] < 0.5
+
+
+def test_shared_buckets_keep_the_rate_across_calls(stub_server):
+    stub_server.respond("/ok", "ok")
+    buckets = {}
+
+    # Page by page, like crawl_newest: a fresh fetcher per call, one bucket per host
+    for _ in range(3):
+        fetch_all([(stub_server.base_url + "/ok", None)], rate=5, burst=1, buckets=buckets)
+
+    assert _spans_by_host(stub_server)["127.0.0.1"] >= 0.35
+
+
+def test_get_many_returns_errors_and_timeouts_in_order(stub_server):
+    stub_server.respond("/ok", "ok")
+    stub_server.respond("/broken", "oops", status=500)
+    stub_server.respond("/slow", "late", delay=2)
+
+    results = fetch_all([
+        (stub_server.base_url + "/ok", {"q": "agriculture 4.0"}),
+        (stub_server.base_url + "/broken", None),
+        (stub_server.base_url + "/slow", None),
+        (f"http://127.0.0.1:{_closed_port()}/ok", None),
+    ], rate=100, burst=10, timeout=0.5)
+
+    ok, broken, slow, refused = results
+    assert isinstance(ok, FetchResult) and ok.status == 200 and ok.text == "ok"
+    assert isinstance(broken, FetchResult) and broken.status == 500
+    assert isinstance(slow, asyncio.TimeoutError)
+    assert isinstance(refused, aiohttp.ClientConnectionError)
+    assert stub_server.requests[0][1] == {"q": "agriculture 4.0"}
+
+
+def test_springer_pages_are_fetched_and_parsed(stub_server, monkeypatch):
+    stub_server.respond_fixture("/search", "springer_search.html")
+    monkeypatch.setattr(scrape_springer, "SEARCH_URL", stub_server.base_url + "/search")
+    monkeypatch.setattr(scrape_springer, "HTTP_CACHE", None)
+
+    results = scrape_springer.fetch_articles({"springer_relevant": "relevance"}, pages=2)
+
+    articles = results["springer_relevant"]
+    assert len(articles) == 4
+    assert sorted(query["page"] for _, query, _, _ in stub_server.requests) == ["1", "2"]
+    assert all(query["sortBy"] == "relevance" for _, query, _, _ in stub_server.requests)
+    first, second = articles[:2]
+    assert first["title"] == "Digital twins for Agriculture 4.0"
+    assert first["url"] == "https://link.springer.com/article/10.1007/s11119-024-10111-1"
+    assert first["authors"] == "A. Martin, B. Rossi"
+    assert first["published"] == "05 March 2024"
+    assert first["description"] == "A review of digital twin platforms for farms."
+    assert (second["description"], second["authors"], second["published"]) == (
+        "No Description", "No Authors", "No Date")
+
+
+def test_failed_springer_page_is_skipped(stub_server, monkeypatch):
+    stub_server.respond("/search", "rate limited", status=429)
+    monkeypatch.setattr(scrape_springer, "SEARCH_URL", stub_server.base_url + "/search")
+    monkeypatch.setattr(scrape_springer, "HTTP_CACHE", None)
+
+    assert scrape_springer.fetch_articles({"springer_newest": "newestFirst"}, pages=1) == {"springer_newest": []}
+
+
+def test_serpapi_sort_modes_are_fetched_and_parsed(stub_server, monkeypatch):
+    stub_server.respond_fixture("/search", "serpapi_scholar.json")
+    monkeypatch.setattr(scrape_google_scholar, "SERPAPI_URL", stub_server.base_url + "/search")
+    monkeypatch.setattr(scrape_google_scholar, "SERPAPI_API_KEY", "test-key")
+    monkeypatch.setattr(scrape_google_scholar, "HTTP_CACHE", None)
+
+    results = scrape_google_scholar.search_google_scholar("Agriculture 4.0", scisbd_values=[0, 2], pages=1)
+
+    assert {query["scisbd"] for _, query, _, _ in stub_server.requests} == {"0", "2"}
+    assert all(query["api_key"] == "test-key" for _, query, _, _ in stub_server.requests)
+    relevant, newest = results[0], results[2]
+    assert [article["search_mode"] for article in relevant + newest] == ["relevance"] * 2 + ["newest"] * 2
+    first, second = relevant
+    assert first["citations"] == 412
+    assert first["publication_info"] == "S Rose, J Chilvers - Agricultural Systems, 2018"
+    assert first["cached_link"] == "https://scholar.googleusercontent.com/x"
+    assert (second["snippet"], second["citations"], second["cached_link"]) == ("No Snippet", None, None)
+
+
+def test_failed_serpapi_request_gives_no_articles(stub_server, monkeypatch):
+    stub_server.respond("/search", '{"error": "Invalid API key"}', status=401, content_type="application/json")
+    monkeypatch.setattr(scrape_google_scholar, "SERPAPI_URL", stub_server.base_url + "/search")
+    monkeypatch.setattr(scrape_google_scholar, "HTTP_CACHE", None)
+
+    assert scrape_google_scholar.search_google_scholar("Agriculture 4.0", scisbd_values=[0]) == {0: []}
+
+
+def test_springer_searches_share_one_loop_and_one_bucket(stub_server, monkeypatch):
+    stub_server.respond("/search", (FIXTURES_DIR / "springer_search.html").read_bytes(), delay=0.4)
+    db = FakeDatabase()
+    monkeypatch.setattr(scrape_springer, "db", db)
+    monkeypatch.setattr(scrape_springer, "SEARCH_URL", stub_server.base_url + "/search")
+    monkeypatch.setattr(scrape_springer, "HTTP_CACHE", None)
+    monkeypatch.setattr(scrape_springer, "BUCKETS", {})
+    monkeypatch.setattr(scrape_springer, "SPRINGER_RATE", (10, 1))
+    # The first 'newest' article is the last one seen by the previous run
+    known = assign_identities(scrape_springer.parse_articles((FIXTURES_DIR / "springer_search.html").read_bytes()))
+    save_checkpoint(db, scrape_springer.NEWEST_COLLECTION, [known[0][IDENTITY_FIELD]])
+
+    relevant, newest, head = scrape_springer._run(scrape_springer.crawl_springer)
+
+    sorts = [query["sortBy"] for _, query, _, _ in stub_server.requests]
+    assert sorted(sorts) == ["newestFirst"] + ["relevance"] * scrape_springer.PAGES
+    assert len(relevant) == 2 * scrape_springer.PAGES and newest == [] and head == [known[0][IDENTITY_FIELD], known[1][IDENTITY_FIELD]]
+    times = sorted(at for _, _, _, at in stub_server.requests)
+    # One bucket (burst 1, 10/s) for both searches...
+    assert all(later - earlier >= 0.08 for earlier, later in zip(times, times[1:]))
+    # ...and no search waiting for the other one's 0.4 s responses
+    assert times[-1] - times[0] < 0.35
@@ -0,0 +1,135 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from credibility_engine import (
+    CACHE_TTL, QUARANTINE_COLLECTION, CredibilityEngine, Verdict, WhoisCache, quarantine_articles,
+    rescore_quarantine,
+)
+from credibility_rules import RuleSet
+
+from fake_mongo import FakeDatabase
+
+OLD = datetime.now() - timedelta(days=3650)
+YOUNG = datetime.now() - timedelta(days=30)
+
+
+class StubWhois:
+    """WHOIS backend answering creation dates from a dict; logs each query"""
+
+    def __init__(self, creation_dates, failing=()):
+        self.creation_dates = creation_dates
+        self.failing = set(failing)
+        self.queries = []
+
+    def __call__(self, domain):
+        self.queries.append((domain, time.monotonic()))
+        if domain in self.failing:
+            raise ConnectionResetError("whois server closed the connection")
+        return self.creation_dates.get(domain)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = WhoisCache(tmp_path / "whois.sqlite")
+    yield cache
+    cache.close()
+
+
+def _engine(cache, lookup, **kwargs):
+    rules = RuleSet(blacklist=["infowars.com"], suspicious_tlds=[".xyz"])
+    return CredibilityEngine(cache=cache, lookup=lookup, rules=rules, server_interval=0, **kwargs)
+
+
+def test_each_distinct_domain_is_looked_up_once(cache):
+    whois = StubWhois({"agrinews.com": OLD, "newfarm.org": YOUNG})
+
+    verdicts = _engine(cache, whois).check_domains([
+        "agrinews.com", "AgriNews.com", "agrinews.com", "newfarm.org", "nodate.net",
+        "infowars.com", "cheap-seeds.xyz", "", None,
+    ])
+
+    assert sorted(domain for domain, _ in whois.queries) == ["agrinews.com", "newfarm.org", "nodate.net"]
+    assert {domain: (verdict.credible, verdict.reason) for domain, verdict in verdicts.items()} == {
+        "agrinews.com": (True, None),
+        "newfarm.org": (False, "young_domain"),
+        "nodate.net": (False, "no_creation_date"),
+        "infowars.com": (False, "blacklist"),
+        "cheap-seeds.xyz": (False, "suspicious_tld"),
+    }
+
+
+def test_cached_domains_are_not_looked_up_again(cache, tmp_path):
+    _engine(cache, StubWhois({"agrinews.com": OLD, "newfarm.org": YOUNG})).check_domains(
+        ["agrinews.com", "newfarm.org"])
+
+    # Next run: a new cache on the same file, a WHOIS backend that knows nothing
+    whois = StubWhois({})
+    reopened = WhoisCache(tmp_path / "whois.sqlite")
+    verdicts = _engine(reopened, whois).check_domains(["agrinews.com", "newfarm.org"])
+    reopened.close()
+
+    assert whois.queries == []
+    assert verdicts["agrinews.com"].credible
+    assert verdicts["agrinews.com"].creation_date == OLD
+    assert verdicts["newfarm.org"].reason == "young_domain"
+
+
+def test_expired_entries_and_old_errors_are_looked_up_again(cache):
+    stale = time.time() - CACHE_TTL - 1
+    cache.put(Verdict("agrinews.com", True, None, OLD), now=stale)
+    cache.put(Verdict("flaky.org", False, "whois_error"), now=time.time() - cache.error_ttl - 1)
+    cache.put(Verdict("down.net", False, "whois_error"))
+    whois = StubWhois({"agrinews.com": OLD, "flaky.org": OLD})
+
+    verdicts = _engine(cache, whois).check_domains(["agrinews.com", "flaky.org", "down.net"])
+
+    assert sorted(domain for domain, _ in whois.queries) == ["agrinews.com", "flaky.org"]
+    assert verdicts["flaky.org"].credible
+    assert verdicts["down.net"].reason == "whois_error"
+
+
+def test_failed_lookups_are_cached_as_errors(cache):
+    whois = StubWhois({}, failing={"down.net"})
+
+    verdicts = _engine(cache, whois).check_domains(["down.net"])
+
+    assert (verdicts["down.net"].credible, verdicts["down.net"].reason) == (False, "whois_error")
+    assert cache.get("down.net") == (True, None, "whois_error")
+
+
+def test_lookups_are_rate_limited_per_whois_server(cache):
+    whois = StubWhois({})
+    engine = CredibilityEngine(cache=cache, lookup=whois, rules=RuleSet(), max_workers=4, server_interval=0.2)
+
+    start = time.monotonic()
+    engine.check_domains(["a.com", "b.com", "c.com", "d.org"])
+
+    by_server = {}
+    for domain, at in whois.queries:
+        by_server.setdefault(domain.rsplit('.', 1)[-1], []).append(at)
+    com = sorted(by_server["com"])
+    assert all(later - earlier >= 0.19 for earlier, later in zip(com, com[1:]))
+    # .org has its own WHOIS server: not queued behind the .com lookups
+    assert by_server["org"][0] - start < 0.15
+
+
+def test_rescoring_restores_the_domains_the_rules_now_accept(cache):
+    db = FakeDatabase()
+    collection = db["google_alerts_Agriculture4.0"]
+    collection.insert_many([
+        {"title": "Agritech coop", "url": "https://coop.example.xyz/a", "domain": "coop.example.xyz"},
+        {"title": "Spam", "url": "https://spam.xyz/b", "domain": "spam.xyz"},
+    ])
+    engine = _engine(cache, StubWhois({}))
+    articles = list(collection.find())
+    verdicts = engine.check_domains(article["domain"] for article in articles)
+    quarantine_articles(db, collection.name, [(article, verdicts[article["domain"]]) for article in articles])
+    assert collection.count_documents({}) == 0
+
+    engine.rules = RuleSet(allowlist=["example.xyz"], suspicious_tlds=[".xyz"])
+
+    assert rescore_quarantine(db, engine) == 1
+    assert [doc["title"] for doc in collection.find()] == ["Agritech coop"]
+    assert [doc["domain"] for doc in db[QUARANTINE_COLLECTION].find()] == ["spam.xyz"]
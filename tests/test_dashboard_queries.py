@@ -0,0 +1,49 @@
+import dashboard_queries as dq
+
+from fake_mongo import FakeDatabase
+
+DAY = "2024-03-12"
+
+
+def _article(title, date=DAY, **fields):
+    return dict(title=title, url=f"https://example.org/{title.lower()}", date=date, **fields)
+
+
+def test_items_keep_the_order_the_sources_returned():
+    db = FakeDatabase()
+    db["springer_agriculture_4_0_relevant"].insert_many([
+        _article("Zoning"), _article("Agronomy"), _article("Monitoring"),
+    ])
+    db["wiley_agriculture_4_0_relevant"].insert_many([_article("Yield"), _article("Biochar")])
+
+    items = dq.fetch_items(db, ["springer_agriculture_4_0_relevant", "wiley_agriculture_4_0_relevant"], DAY)
+
+    assert list(items["title"]) == ["Zoning", "Agronomy", "Monitoring", "Yield", "Biochar"]
+    assert list(items.index) == [0, 1, 2, 3, 4]
+
+
+def test_items_of_other_days_and_duplicates_are_left_out():
+    db = FakeDatabase()
+    db[dq.GOOGLE_ALERTS_COLLECTION].insert_many([
+        _article("Drones", article_id="a1"), _article("Old", date="2024-03-01"), _article("Sensors"),
+    ])
+    db["ieee_agriculture_4_0_newest"].insert_many([_article("Drones (IEEE)", article_id="a1")])
+
+    items = dq.fetch_items(db, [dq.GOOGLE_ALERTS_COLLECTION, "ieee_agriculture_4_0_newest"], DAY)
+
+    assert list(items["title"]) == ["Drones", "Sensors"]
+    assert list(items["source_label"]) == ["Google Alerts", "Google Alerts"]
+
+
+def test_relevant_items_follow_the_stored_ranking():
+    db = FakeDatabase()
+    db["scholar_agriculture_4_0_relevant"].insert_many([
+        _article("Third", date="2024-01-05", rank=3), _article("First", date="2024-02-01", rank=1),
+        _article("Second", rank=2),
+    ])
+    db["springer_agriculture_4_0_relevant"].insert_many([_article("Zoning"), _article("Agronomy")])
+
+    items = dq.fetch_items(db, ["scholar_agriculture_4_0_relevant", "springer_agriculture_4_0_relevant"], DAY)
+
+    assert list(items["title"]) == ["First", "Second", "Third", "Zoning", "Agronomy"]
+    assert list(items["rank"][:3]) == [1, 2, 3]
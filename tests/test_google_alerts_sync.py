@@ -0,0 +1,184 @@
+import base64
+import json
+
+import scrape_google_alert
+from incremental_crawl import CHECKPOINT_COLLECTION
+from ingestion_writer import KEY_FIELD
+
+import pytest
+
+from fake_mongo import FakeDatabase
+
+
+def _alert_html(*cards):
+    payload = {"cards": [{"widgets": [dict(widget, type="LINK") for widget in cards]}]}
+    return f'<html><body><script type="application/json">{json.dumps(payload)}</script></body></html>'
+
+
+def _message(message_id, html):
+    data = base64.urlsafe_b64encode(html.encode('utf-8')).decode('ascii')
+    return {
+        "id": message_id,
+        "payload": {
+            "headers": [{"name": "From", "value": f"Google Alerts <{scrape_google_alert.ALERTS_SENDER}>"}],
+            "parts": [{"mimeType": "text/html", "body": {"data": data}}],
+        },
+    }
+
+
+class _Call:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class _Batch:
+    def __init__(self, gmail, callback):
+        self.gmail = gmail
+        self.callback = callback
+        self.ids = []
+
+    def add(self, call, request_id):
+        self.ids.append(request_id)
+
+    def execute(self):
+        self.gmail.batch_sizes.append(len(self.ids))
+        for message_id in self.ids:
+            if self.gmail.failures.get(message_id, 0):
+                self.gmail.failures[message_id] -= 1
+                self.callback(message_id, None, Exception("429 Too Many Requests"))
+            else:
+                self.callback(message_id, self.gmail.by_id[message_id], None)
+
+
+class _Messages:
+    def __init__(self, by_id):
+        self.by_id = by_id
+
+    def list(self, **params):
+        return _Call({"messages": [{"id": message_id} for message_id in self.by_id]})
+
+    def get(self, **params):
+        return _Call(self.by_id[params["id"]])
+
+
+class _History:
+    def __init__(self, gmail):
+        self.gmail = gmail
+
+    def list(self, **params):
+        self.gmail.history_starts.append(params["startHistoryId"])
+        added = [{"message": {"id": message_id}} for message_id in self.gmail.by_id]
+        return _Call({"historyId": self.gmail.history_id, "history": [{"messagesAdded": added}]})
+
+
+class FakeGmail:
+    """users().messages().list/get, users().history().list, users().getProfile() and batches.
+
+    `failures` maps a message id to the number of batch calls that fail for it.
+    """
+
+    def __init__(self, messages, history_id="500", failures=None):
+        self.by_id = {message["id"]: message for message in messages}
+        self.history_id = history_id
+        self.failures = dict(failures or {})
+        self.batch_sizes = []
+        self.history_starts = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return _Messages(self.by_id)
+
+    def history(self):
+        return _History(self)
+
+    def getProfile(self, userId):
+        return _Call({"historyId": self.history_id})
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+
+@pytest.fixture
+def alerts_db(monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setattr(scrape_google_alert, "db", db)
+    monkeypatch.setattr(scrape_google_alert, "collection", db["google_alerts_Agriculture4.0"])
+    monkeypatch.setattr(scrape_google_alert, "RETRY_BACKOFF", 0)
+    return db
+
+
+def _saved_history_id(db):
+    return db[CHECKPOINT_COLLECTION].find_one({"_id": scrape_google_alert.SYNC_STATE_ID})["history_id"]
+
+
+def test_first_sync_on_a_collection_with_duplicates(alerts_db):
+    db = alerts_db
+    collection = db["google_alerts_Agriculture4.0"]
+    # The previous scraper inserted every card of every unread alert at each run
+    old_card = {"title": "Smart farming in Kenya", "url": "https://example.org/kenya",
+                "source": "Google Alerts", "date": "2024-03-01"}
+    collection.insert_many([dict(old_card) for _ in range(3)])
+
+    html = _alert_html(
+        {"title": "Smart farming in Kenya", "url": "https://example.org/kenya", "description": "again"},
+        {"title": "Drones for vineyards", "url": "https://example.org/drones", "description": "new"},
+    )
+    scrape_google_alert.fetch_new_google_alerts(FakeGmail([_message("m1", html), _message("m2", html)]))
+
+    titles = [doc["title"] for doc in collection.find()]
+    assert titles.count("Smart farming in Kenya") == 3   # old copies kept, nothing re-inserted
+    assert titles.count("Drones for vineyards") == 1
+    assert collection.count_documents({KEY_FIELD: {"$exists": True}}) == 2
+    assert _saved_history_id(db) == "500"
+
+
+def _alerts(count):
+    return [
+        _message(f"m{i}", _alert_html({"title": f"Alert {i}", "url": f"https://example.org/{i}"}))
+        for i in range(count)
+    ]
+
+
+def test_history_sync_retries_failed_sub_requests(alerts_db):
+    scrape_google_alert.save_history_id("400")
+    gmail = FakeGmail(_alerts(60), history_id="500", failures={"m3": 2, "m57": 1})
+
+    scrape_google_alert.fetch_new_google_alerts(gmail)
+
+    assert gmail.history_starts == ["400"]
+    assert gmail.batch_sizes == [50, 10, 2, 1]
+    assert alerts_db["google_alerts_Agriculture4.0"].count_documents({}) == 60
+    assert _saved_history_id(alerts_db) == "500"
+
+
+def test_history_sync_keeps_its_start_when_a_message_stays_unfetched(alerts_db):
+    scrape_google_alert.save_history_id("400")
+    messages = _alerts(3)
+    failures = {"m1": scrape_google_alert.FETCH_RETRIES + 1}
+
+    scrape_google_alert.fetch_new_google_alerts(FakeGmail(messages, history_id="500", failures=failures))
+
+    collection = alerts_db["google_alerts_Agriculture4.0"]
+    assert sorted(doc["title"] for doc in collection.find()) == ["Alert 0", "Alert 2"]
+    assert _saved_history_id(alerts_db) == "400"
+
+    # Next run: the same history is read again and the missing alert is stored
+    gmail = FakeGmail(messages, history_id="510")
+    scrape_google_alert.fetch_new_google_alerts(gmail)
+
+    assert gmail.history_starts == ["400"]
+    assert sorted(doc["title"] for doc in collection.find()) == ["Alert 0", "Alert 1", "Alert 2"]
+    assert _saved_history_id(alerts_db) == "510"
+
+
+def test_unread_fallback_saves_no_history_id_when_a_message_fails(alerts_db):
+    gmail = FakeGmail(_alerts(2), failures={"m0": scrape_google_alert.FETCH_RETRIES + 1})
+
+    scrape_google_alert.fetch_new_google_alerts(gmail)
+
+    assert alerts_db[CHECKPOINT_COLLECTION].find_one({"_id": scrape_google_alert.SYNC_STATE_ID}) is None
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import scrape_google_scholar
+import scrape_springer
+from async_fetch import fetch_all
+from http_cache import ResponseCache, request_key
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def _without_date(articles):
+    return [{key: value for key, value in article.items() if key != "date"} for article in articles]
+
+
+def test_offline_mode_replays_springer_pages_into_the_parser(stub_server, monkeypatch, tmp_path):
+    stub_server.respond_fixture("/search", "springer_search.html")
+    cache = ResponseCache(tmp_path / "http_cache.sqlite")
+    monkeypatch.setattr(scrape_springer, "SEARCH_URL", stub_server.base_url + "/search")
+    monkeypatch.setattr(scrape_springer, "HTTP_CACHE", cache)
+    monkeypatch.setattr(scrape_springer, "BUCKETS", {})
+    online = scrape_springer.fetch_articles({"springer_relevant": "relevance"}, pages=1)
+
+    cache.offline = True
+    stub_server.respond("/search", "gone", status=500)
+    offline = scrape_springer.fetch_articles({"springer_relevant": "relevance"}, pages=2)
+
+    assert len(stub_server.requests) == 1
+    articles = offline["springer_relevant"]
+    assert _without_date(articles) == _without_date(online["springer_relevant"])
+    assert articles[0]["title"] == "Digital twins for Agriculture 4.0"
+    cache.close()
+
+
+def test_offline_mode_replays_serpapi_results_into_the_parser(stub_server, monkeypatch, tmp_path):
+    stub_server.respond_fixture("/search", "serpapi_scholar.json")
+    cache = ResponseCache(tmp_path / "http_cache.sqlite")
+    monkeypatch.setattr(scrape_google_scholar, "SERPAPI_URL", stub_server.base_url + "/search")
+    monkeypatch.setattr(scrape_google_scholar, "HTTP_CACHE", cache)
+    monkeypatch.setattr(scrape_google_scholar, "SERPAPI_API_KEY", "first-key")
+    scrape_google_scholar.search_google_scholar("Agriculture 4.0", scisbd_values=[0], pages=1)
+
+    # The API key is not part of the cache key: a rotated key still replays
+    cache.offline = True
+    monkeypatch.setattr(scrape_google_scholar, "SERPAPI_API_KEY", "rotated-key")
+    results = scrape_google_scholar.search_google_scholar("Agriculture 4.0", scisbd_values=[0], pages=1)
+
+    assert len(stub_server.requests) == 1
+    first, second = results[0]
+    assert (first["citations"], first["search_mode"]) == (412, "relevance")
+    assert first["publication_info"] == "S Rose, J Chilvers - Agricultural Systems, 2018"
+    assert second["snippet"] == "No Snippet"
+    cache.close()
+
+
+def test_not_modified_refreshes_the_stored_validators(stub_server, tmp_path):
+    url = stub_server.base_url + "/page"
+    cache = ResponseCache(tmp_path / "http_cache.sqlite", ttl=0)
+    cache.put(request_key(url), 200, {"ETag": '"v1"', "Content-Type": "text/html"}, b"<html>page</html>")
+    stub_server.respond("/page", status=304, headers={"ETag": '"v2"', "Cache-Control": "max-age=60"})
+
+    result, = fetch_all([(url, None)], cache=cache)
+    stored = cache.get(request_key(url))
+    fetch_all([(url, None)], cache=cache)
+
+    assert (result.status, result.body, result.from_cache) == (200, b"<html>page</html>", True)
+    stored_headers = {name.lower(): value for name, value in stored.headers.items()}
+    assert {name.lower(): value for name, value in result.headers.items()} == stored_headers
+    assert (stored_headers["etag"], stored_headers["content-type"], stored_headers["cache-control"]) == (
+        '"v2"', "text/html", "max-age=60")
+    assert sum(name.lower() == "etag" for name in stored.headers) == 1
+    assert [headers.get("If-None-Match") for headers in stub_server.request_headers] == ['"v1"', '"v2"']
+    cache.close()
+
+
+def test_importing_the_scrapers_creates_no_cache_file(tmp_path):
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR))
+    subprocess.run([sys.executable, "-c", "import scrape_springer, scrape_google_scholar"],
+                   cwd=tmp_path, env=env, check=True)
+
+    assert not (tmp_path / "cache" / "http_cache.sqlite").exists()
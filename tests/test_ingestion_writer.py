@@ -0,0 +1,61 @@
+import ingestion_writer
+from ingestion_writer import KEY_FIELD, article_key, ensure_indexes, refresh_articles, write_articles
+
+from fake_mongo import FakeDatabase
+
+
+def _article(title, url):
+    return {"title": title, "url": url, "date": "2024-03-12"}
+
+
+def test_existing_duplicates_do_not_block_the_index():
+    collection = FakeDatabase()["scholar"]
+    # Stored before article keys existed: same article once normalized
+    collection.insert_many([
+        _article("Smart Farming!", "https://example.org/a/?utm_source=x"),
+        _article("smart farming", "https://EXAMPLE.org/a"),
+        _article("Drones", "https://example.org/b"),
+    ])
+
+    ensure_indexes(collection)
+
+    keyed = list(collection.find({KEY_FIELD: {"$exists": True}}))
+    assert len(keyed) == 2
+    assert keyed[0]["title"] == "Smart Farming!"   # the oldest copy keeps the key
+    assert collection.count_documents({KEY_FIELD: {"$exists": False}}) == 1
+
+
+def test_write_after_duplicates_only_inserts_new_articles():
+    collection = FakeDatabase()["scholar"]
+    collection.insert_many([_article("Smart farming", "https://example.org/a") for _ in range(2)])
+
+    inserted, skipped = write_articles(collection, [
+        _article("Smart farming", "https://example.org/a"),
+        _article("Drones", "https://example.org/b"),
+    ])
+
+    assert (inserted, skipped) == (1, 1)
+    assert collection.count_documents({}) == 3
+    assert collection.full_name in ingestion_writer._indexed_collections
+
+
+def test_keys_of_already_keyed_documents_are_left_alone():
+    collection = FakeDatabase()["scholar"]
+    article = _article("Smart farming", "https://example.org/a")
+    collection.insert_one(dict(article, **{KEY_FIELD: article_key(article)}))
+    collection.insert_one(dict(article))
+
+    ensure_indexes(collection)
+
+    assert collection.count_documents({KEY_FIELD: article_key(article)}) == 1
+
+
+def test_refresh_ranks_and_removes():
+    collection = FakeDatabase()["relevant"]
+    refresh_articles(collection, [_article("A", "https://a.org"), _article("B", "https://b.org")])
+
+    counts = refresh_articles(collection, [_article("B", "https://b.org"), _article("C", "https://c.org")])
+
+    assert counts == (1, 1, 1)
+    ranks = {doc["title"]: doc["rank"] for doc in collection.find()}
+    assert ranks == {"B": 1, "C": 2}
@@ -0,0 +1,26 @@
+import sys
+
+from pipeline_runner import Job, run_pipeline
+
+
+def test_unlaunchable_job_is_recorded_as_failed():
+    jobs = [Job("first", "missing.py", retries=2), Job("second", "missing.py", deps=["first"])]
+    results = run_pipeline(jobs, python="/nonexistent/python", log_path=None)
+
+    assert results["first"]["status"] == "failed"
+    assert results["first"]["attempts"] == 1
+    assert "No such file" in results["first"]["error"]
+    assert results["second"]["status"] == "failed"
+
+
+def test_retries_are_opt_in(tmp_path):
+    script = tmp_path / "fails.py"
+    script.write_text("import sys\nsys.exit(3)\n")
+    results = run_pipeline(
+        [Job("default", str(script)), Job("retried", str(script), retries=1)],
+        python=sys.executable, log_path=None
+    )
+
+    assert results["default"]["attempts"] == 1
+    assert results["retried"]["attempts"] == 2
+    assert results["retried"]["returncode"] == 3
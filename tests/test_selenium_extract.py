@@ -0,0 +1,103 @@
+import functools
+import http.server
+import shutil
+import threading
+
+import pytest
+
+from selenium_extract import (
+    EXTRACTORS, IEEE_RESULT_SELECTOR, IEEE_RESULTS_JS, WILEY_RESULT_SELECTOR, extract_ieee_results,
+    extract_wiley_results, wait_for_results,
+)
+
+from conftest import FIXTURES_DIR
+
+CHROME = any(shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"))
+
+
+class FakeDriver:
+    """Returns canned rows from execute_script and logs the calls"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        return self.rows
+
+
+def test_ieee_fields_come_from_one_script_call_with_defaults():
+    driver = FakeDriver([
+        {"title": "IoT sensing", "url": "https://ieeexplore.ieee.org/document/1/",
+         "authors": "Ana Silva", "conference": "AgriFood Electronics", "year": "Year: 2024"},
+        {"title": None, "url": None, "authors": None, "conference": None, "year": None},
+    ])
+
+    results = extract_ieee_results(driver)
+
+    assert driver.calls == [(IEEE_RESULTS_JS, (IEEE_RESULT_SELECTOR,))]
+    assert results[1] == {"title": "No Title", "url": "No URL", "authors": "No Authors",
+                          "conference": "No Conference", "year": "No Year"}
+
+
+def test_wiley_link_without_title_gives_no_url():
+    driver = FakeDriver([
+        {"title": None, "url": "https://onlinelibrary.wiley.com/doi/x", "authors": None,
+         "journal": None, "publication_date": None},
+    ])
+
+    assert extract_wiley_results(driver) == [{
+        "title": "No Title", "url": "No URL", "authors": "No Authors",
+        "journal": "No Journal", "publication_date": "No Date",
+    }]
+    assert driver.calls[0][1] == (WILEY_RESULT_SELECTOR,)
+
+
+@pytest.fixture(scope="module")
+def fixtures_url():
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(FIXTURES_DIR))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="module")
+def driver():
+    from browser_pool import BrowserPool
+
+    with BrowserPool() as pool, pool.session() as driver:
+        yield driver
+
+
+@pytest.mark.skipif(not CHROME, reason="Chrome is not installed")
+@pytest.mark.parametrize("name, expected", [
+    ("ieee", [
+        {"title": "IoT sensing for Agriculture 4.0", "url": "/document/10456789/",
+         "authors": "Ana Silva; Kofi Mensah", "conference": "2024 IEEE Conference on AgriFood Electronics",
+         "year": "Year: 2024"},
+        {"title": "No Title", "url": "No URL", "authors": "No Authors", "conference": "No Conference",
+         "year": "No Year"},
+    ]),
+    ("wiley", [
+        {"title": "Precision livestock farming in Agriculture 4.0", "url": "/doi/10.1002/agj2.21234",
+         "authors": "Claire Dubois, Emeka Okafor", "journal": "Agronomy Journal",
+         "publication_date": "05 March 2024"},
+        {"title": "No Title", "url": "No URL", "authors": "No Authors", "journal": "No Journal",
+         "publication_date": "No Date"},
+    ]),
+])
+def test_saved_result_pages_are_read_in_the_browser(name, expected, driver, fixtures_url):
+    selector, extract = EXTRACTORS[name]
+    driver.get(f"{fixtures_url}/{name}_results.html")
+
+    assert wait_for_results(driver, selector, timeout=5)
+    rows = extract(driver)
+
+    # Links are resolved against the page by the browser
+    for row in expected:
+        if row["url"] != "No URL":
+            row["url"] = fixtures_url + row["url"]
+    assert rows == expected
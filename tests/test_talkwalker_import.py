@@ -0,0 +1,86 @@
+import hashlib
+import threading
+from pathlib import Path
+
+from extract_informations_from_talkwalker import _BackgroundWriter, _parse_file
+
+EXPORT = (
+    "[Talkwalker Alerts] Agriculture 4.0\n"
+    "Icon Capteurs connectés pour la ferme de demain...\n"
+    "12/03/24 10:00 | France | https://www.example.fr/capteurs\n"
+    "Icon Drones et vignobles\n"
+    "13/03/24 08:30 | Italy | https://www.example.it/droni?utm_source=talkwalker\n"
+)
+
+
+def test_crlf_export_gives_the_same_articles_as_lf(tmp_path):
+    lf, crlf = tmp_path / "lf.txt", tmp_path / "crlf.txt"
+    lf.write_bytes(EXPORT.encode('utf-8'))
+    crlf.write_bytes(EXPORT.replace("\n", "\r\n").encode('utf-8'))
+
+    digest, articles = _parse_file(str(crlf))
+    _, lf_articles = _parse_file(str(lf))
+
+    assert digest == hashlib.sha1(crlf.read_bytes()).hexdigest()
+    assert [article['lien'] for article in articles] == [
+        "https://www.example.fr/capteurs", "https://www.example.it/droni?utm_source=talkwalker"
+    ]
+    assert [(a['titre'], a['lien'], a['pays'], a['date']) for a in articles] == \
+        [(a['titre'], a['lien'], a['pays'], a['date']) for a in lf_articles]
+
+
+def test_imported_titles_go_through_clean_title(tmp_path):
+    export = tmp_path / "export.txt"
+    export.write_bytes(
+        "Icon Capteurs connectés  pour la ferme de demain... Tell a Friend\n"
+        "12/03/24 10:00 | France | https://www.example.fr/capteurs\n".encode('utf-8')
+    )
+
+    _, articles = _parse_file(str(export))
+
+    assert [(article['titre'], article['date']) for article in articles] == [
+        ("Capteurs connectés pour la ferme de demain", "2024-03-12")
+    ]
+
+
+def test_writer_errors_reach_the_producer_instead_of_hanging_it():
+    stored = []
+
+    def on_stored(file_path, digest, articles, inserted, duplicates):
+        stored.append(file_path.name)
+        if len(stored) == 2:
+            raise OSError("manifest: disk full")
+
+    writer = _BackgroundWriter(lambda articles: (len(articles), 0), on_stored, max_pending=1)
+    errors = []
+
+    def produce():
+        try:
+            for i in range(20):
+                writer.submit(Path(f"export-{i}.txt"), "sha1", [{}])
+            writer.close()
+        except OSError as e:
+            errors.append(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    producer.join(5)
+
+    assert not producer.is_alive()
+    assert [str(e) for e in errors] == ["manifest: disk full"]
+    assert stored == ["export-0.txt", "export-1.txt"]
+
+
+def test_store_errors_only_skip_their_file():
+    def store(articles):
+        if not articles:
+            raise ValueError("empty batch")
+        return len(articles), 0
+
+    stored = []
+    writer = _BackgroundWriter(store, lambda file_path, *args: stored.append(file_path.name))
+    for name, articles in (("a.txt", [{}]), ("b.txt", []), ("c.txt", [{}, {}])):
+        writer.submit(Path(name), "sha1", articles)
+    writer.close()
+
+    assert stored == ["a.txt", "c.txt"]
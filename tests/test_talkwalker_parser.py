@@ -0,0 +1,36 @@
+import hashlib
+
+import pytest
+
+import talkwalker_parser
+from talkwalker_parser import _read_text, iter_file_records, iter_records_regex
+
+from conftest import FIXTURES_DIR
+
+CORPUS = sorted((FIXTURES_DIR / "talkwalker").glob("*.txt"))
+# 1 and 2 bytes split every \r\n and multi-byte character across chunks
+CHUNK_SIZES = [1, 2, 7, 64, talkwalker_parser.CHUNK_SIZE]
+
+
+def test_corpus_covers_the_tricky_exports():
+    raw = {path.name: path.read_bytes() for path in CORPUS}
+    assert any(b"\r\n" in content for content in raw.values())
+    assert {"spilled_fields.txt", "empty_titles.txt", "malformed.txt"} <= set(raw)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("path", CORPUS, ids=lambda path: path.name)
+def test_streaming_parser_matches_the_regex(path, chunk_size):
+    expected = list(iter_records_regex(_read_text(path)))
+
+    assert expected
+    assert list(iter_file_records(path, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("path", CORPUS, ids=lambda path: path.name)
+def test_mapped_files_give_the_same_records(path, monkeypatch):
+    monkeypatch.setattr(talkwalker_parser, "MMAP_THRESHOLD", 0)
+    hasher = hashlib.sha1()
+
+    assert list(iter_file_records(path, hasher, chunk_size=7)) == list(iter_records_regex(_read_text(path)))
+    assert hasher.hexdigest() == hashlib.sha1(path.read_bytes()).hexdigest()
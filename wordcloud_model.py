@@ -0,0 +1,125 @@
+import io
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from wordcloud import WordCloud, STOPWORDS
+
+# --- Settings ---
+MODEL_DIR = Path("cache/wordcloud")
+TOKEN_RE = re.compile(r"\w[\w']*", re.UNICODE)
+
+FRENCH_STOPWORDS = {
+    "a", "afin", "ai", "aie", "ainsi", "alors", "au", "aucun", "aussi", "autre", "aux", "avant",
+    "avec", "avoir", "c", "ce", "ceci", "cela", "celle", "celles", "celui", "ces", "cet", "cette",
+    "ceux", "chaque", "chez", "comme", "comment", "d", "dans", "de", "depuis", "des", "deux", "doit",
+    "donc", "dont", "du", "elle", "elles", "en", "encore", "entre", "est", "et", "etc", "été", "être",
+    "eu", "fait", "faire", "il", "ils", "j", "je", "l", "la", "le", "les", "leur", "leurs", "lors",
+    "lui", "m", "mais", "me", "même", "mes", "moins", "mon", "n", "ne", "ni", "nos", "notre", "nous",
+    "on", "ont", "ou", "où", "par", "pas", "peu", "peut", "plus", "pour", "qu", "quand", "que",
+    "quel", "quelle", "quelles", "quels", "qui", "s", "sa", "sans", "se", "selon", "ses", "si",
+    "son", "sont", "sous", "sur", "t", "ta", "te", "tes", "ton", "tous", "tout", "toute", "toutes",
+    "très", "tu", "un", "une", "vers", "via", "vos", "votre", "vous", "y"
+}
+STOP_WORDS = {w.lower() for w in STOPWORDS} | FRENCH_STOPWORDS
+
+
+def tokenize(title):
+    """Lower-cased words of a title without stop words, numbers or single letters"""
+    tokens = []
+    for token in TOKEN_RE.findall(str(title).lower()):
+        if token.endswith("'s"):
+            token = token[:-2]
+        if len(token) > 1 and not token.isdigit() and token not in STOP_WORDS:
+            tokens.append(token)
+    return tokens
+
+
+def frame_titles(df):
+    """Titles of a dashboard frame (Talkwalker documents use 'titre')"""
+    for col in ('title', 'titre'):
+        if col in df.columns:
+            return df[col].dropna().astype(str).tolist()
+    return []
+
+
+class TermFrequencyModel:
+    """Term frequencies of every collected title, updated from loader deltas.
+
+    The model keeps the number of titles it has seen per collection so that a
+    snapshot rebuilt from scratch is detected and triggers a full recount.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = Path(model_dir)
+        self.path = self.model_dir / "frequencies.json"
+        self.counts = Counter()
+        self.rows = {}
+        self.version = 0
+        self.exists = self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.counts = Counter(state.get("counts", {}))
+        self.rows = state.get("rows", {})
+        self.version = state.get("version", 0)
+        return True
+
+    def is_consistent(self, name, rows):
+        return self.rows.get(name, 0) == rows
+
+    def update(self, name, added_titles=(), removed_titles=()):
+        """Add the tokens of new titles and subtract those of deleted ones"""
+        if not added_titles and not removed_titles:
+            return
+        for title in added_titles:
+            self.counts.update(tokenize(title))
+        for title in removed_titles:
+            self.counts.subtract(tokenize(title))
+        self.counts = +self.counts  # drop zero / negative counts
+        self.rows[name] = self.rows.get(name, 0) + len(added_titles) - len(removed_titles)
+        self.version += 1
+
+    def rebuild(self, titles_by_collection):
+        """Recount everything from {collection: [titles]}"""
+        self.counts = Counter()
+        for titles in titles_by_collection.values():
+            for title in titles:
+                self.counts.update(tokenize(title))
+        self.rows = {name: len(titles) for name, titles in titles_by_collection.items()}
+        self.version += 1
+
+    def save(self):
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.version, "rows": self.rows, "counts": self.counts}, f, ensure_ascii=False)
+        tmp_path.replace(self.path)
+        self.exists = True
+
+    def render_png(self, width=800, height=400, max_words=200):
+        """PNG bytes of the word cloud, cached on disk per model version"""
+        if not self.counts:
+            return None
+        png_path = self.model_dir / f"wordcloud_{self.version}_{width}x{height}.png"
+        if png_path.exists():
+            return png_path.read_bytes()
+
+        wordcloud = WordCloud(
+            width=width, height=height, background_color='white', colormap='Greens', max_words=max_words
+        ).generate_from_frequencies(dict(self.counts.most_common(max_words)))
+        buffer = io.BytesIO()
+        wordcloud.to_image().save(buffer, format='PNG')
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        for old_png in self.model_dir.glob("wordcloud_*.png"):
+            old_png.unlink(missing_ok=True)
+        png_path.write_bytes(buffer.getvalue())
+        return buffer.getvalue()